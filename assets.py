@@ -0,0 +1,86 @@
+"""Background asset loading with a keyed cache.
+
+Loads run on a small thread pool and hand back futures, so the menu can
+draw while music and fonts are still being read. Every finished asset
+stays in the cache under its key; asking for it again returns the same
+future without touching the disk.
+"""
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+
+class AssetManager:
+    def __init__(self, workers=2):
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="assets")
+        self.futures = {}
+        self.timings = {}
+        self.lock = threading.Lock()
+
+    def load(self, key, loader, *args):
+        """Start ``loader(*args)`` unless ``key`` is cached; return its future."""
+        with self.lock:
+            future = self.futures.get(key)
+            if future is None:
+                future = self.executor.submit(self._timed, key, loader, *args)
+                self.futures[key] = future
+        return future
+
+    def _timed(self, key, loader, *args):
+        start = time.perf_counter()
+        try:
+            return loader(*args)
+        finally:
+            self.timings[key] = time.perf_counter() - start
+
+    def font(self, name, size):
+        """A font by file path, system name, or None for pygame's default."""
+        if name is None or os.path.exists(name):
+            return self.load(("font", name, size), pygame.font.Font, name, size)
+        return self.load(("font", name, size), pygame.font.SysFont, name, size)
+
+    def music(self, path):
+        """The raw bytes of a music file, ready for ``play_music``."""
+        return self.load(("music", path), _read_bytes, path)
+
+    def image(self, path):
+        """An image as loaded from disk; call ``convert`` on the main thread."""
+        return self.load(("image", path), pygame.image.load, path)
+
+    def get(self, key, default=None):
+        """The asset under ``key`` if it finished loading, else ``default``."""
+        future = self.futures.get(key)
+        if future is None or not future.done() or future.exception() is not None:
+            return default
+        return future.result()
+
+    def report(self):
+        return [f"{key[0]:<6} {os.path.basename(str(key[1]))[:40]:<40} {seconds * 1000:8.1f} ms"
+                for key, seconds in sorted(self.timings.items(), key=lambda kv: -kv[1])]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+_music_source = None
+
+
+def play_music(data, path, loops=-1):
+    """Stream music from bytes already in memory instead of reopening the file."""
+    global _music_source
+    # The mixer streams from the buffer while playing, so keep it referenced
+    _music_source = io.BytesIO(data)
+    pygame.mixer.music.load(_music_source, os.path.splitext(path)[1].lstrip("."))
+    pygame.mixer.music.play(loops)
+
+
+assets = AssetManager()
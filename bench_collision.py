@@ -0,0 +1,73 @@
+"""Compare brute-force and grid broadphase collision at increasing laser counts.
+
+Run with ``python bench_collision.py``. Each row reports the per-frame cost
+of moving the field (including the grid resync) and of one player query.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from collision import first_hit
+from game_patterns import WIDTH, HEIGHT
+from laser_pool import LaserPool
+from spatial_grid import SpatialGrid
+
+COUNTS = (100, 1_000, 10_000, 50_000)
+
+
+def make_pool(count, seed, grid):
+    rng = np.random.default_rng(seed)
+    pool = LaserPool(capacity=count)
+    pool.spawn_many(rng.uniform(0, WIDTH, count), rng.uniform(0, HEIGHT, count),
+                    rng.uniform(0, 2 * np.pi, count), speed=rng.uniform(2, 8, count),
+                    width=rng.integers(2, 7, count), length=rng.choice([24, 32, 48], count))
+    # Keep the population steady: lasers bounce back into the field
+    pool.bounds = (10 * WIDTH, 10 * HEIGHT)
+    if grid:
+        pool.attach_index(SpatialGrid())
+    return pool
+
+
+def bounce(pos, direction, limit):
+    np.copyto(direction, np.abs(direction), where=pos < 0)
+    np.copyto(direction, -np.abs(direction), where=pos > limit)
+
+
+def run(count, frames=60, queries=20, grid=False, seed=0):
+    pool = make_pool(count, seed, grid)
+    rng = np.random.default_rng(seed + 1)
+    points = rng.uniform((0, 0), (WIDTH, HEIGHT), (frames * queries, 2))
+    update_time = 0.0
+    query_time = 0.0
+    hits = 0
+    for frame in range(frames):
+        start = time.perf_counter()
+        bounce(pool.x, pool.cos, WIDTH)
+        bounce(pool.y, pool.sin, HEIGHT)
+        pool.update()
+        update_time += time.perf_counter() - start
+        start = time.perf_counter()
+        for px, py in points[frame * queries:(frame + 1) * queries]:
+            hits += first_hit(pool, px, py, 4) >= 0
+        query_time += time.perf_counter() - start
+    return update_time / frames, query_time / (frames * queries), hits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--counts", type=int, nargs="*", default=COUNTS)
+    args = parser.parse_args(argv)
+
+    print(f"{'lasers':>8} {'mode':>6} {'update ms':>10} {'query us':>10} {'frame ms':>10}")
+    for count in args.counts:
+        for grid in (False, True):
+            update, query, hits = run(count, frames=args.frames, grid=grid)
+            mode = "grid" if grid else "brute"
+            print(f"{count:>8} {mode:>6} {update * 1e3:>10.3f} {query * 1e6:>10.1f} "
+                  f"{(update + query) * 1e3:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Benchmark each level pattern, plus synthetic stress patterns, headlessly.
+
+    python bench_patterns.py --seconds 10 --save baseline.json
+    python bench_patterns.py --seconds 10 --compare baseline.json
+
+Every pattern runs alone through a PatternSwitcher, looping at its level
+duration, for the given number of simulated seconds with an idle,
+invulnerable player. Results can be saved
+as a JSON baseline and later runs compared against it.
+"""
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from emitters import composite_demo
+from game_patterns import WIDTH, HEIGHT, RED
+from pattern_scripts import default_level, load_patterns
+from simulation import Simulation
+
+STRESS_SIZES = (1_000, 10_000, 100_000)
+
+# Metrics where a bigger number is worse, checked by --compare
+TIMED_METRICS = ("spawn_ns_per_laser", "update_ns_per_laser", "collision_ns_per_query")
+
+
+class StressPattern:
+    """Radial spray from the playfield centre tuned to hold ~``target`` lasers live."""
+
+    def __init__(self, target, speed=4.0, length=24, width=3):
+        self.target = target
+        self.speed = speed
+        self.length = length
+        self.width = width
+        # Lasers live roughly (distance to the edge + length) / speed frames
+        lifetime = (0.5 * (WIDTH + HEIGHT) / 2 + length) / speed
+        self.per_frame = max(1, math.ceil(target / lifetime))
+        self.__name__ = f"stress_{target}"
+
+    def emit(self, pool, frame, rng):
+        angles = np.linspace(0, 2 * math.pi, self.per_frame, endpoint=False) + rng.random()
+        pool.spawn_many(WIDTH // 2, HEIGHT // 2, angles, self.speed, RED, self.width, self.length)
+
+
+def bench_pattern(pattern, seconds, seed=0, fps=60, duration=None):
+    """Run one pattern alone, restarting it every ``duration`` seconds like the switcher."""
+    sim = Simulation(seed, patterns=[(pattern, duration or seconds)], fps=fps)
+    lasers = sim.lasers
+    player = sim.player
+    frames = int(seconds * fps)
+    spawn_time = update_time = collision_time = 0.0
+    laser_frames = 0
+    peak_live = 0
+    peak_bytes = 0
+    for _ in range(frames):
+        start = time.perf_counter()
+        sim.spawn()
+        spawned = time.perf_counter()
+        lasers.update()
+        updated = time.perf_counter()
+        player.is_hit(lasers)
+        collided = time.perf_counter()
+        spawn_time += spawned - start
+        update_time += updated - spawned
+        collision_time += collided - updated
+        live = len(lasers)
+        laser_frames += live
+        peak_live = max(peak_live, live)
+        peak_bytes = max(peak_bytes, lasers.nbytes)
+    return {
+        "frames": frames,
+        "spawned": lasers.spawned,
+        "spawn_rate_per_s": lasers.spawned / seconds,
+        "peak_live_lasers": peak_live,
+        "spawn_ns_per_laser": spawn_time * 1e9 / max(1, lasers.spawned),
+        "update_ns_per_laser": update_time * 1e9 / max(1, laser_frames),
+        "collision_ns_per_query": collision_time * 1e9 / frames,
+        "pool_peak_bytes": peak_bytes,
+    }
+
+
+def best_of(pattern, duration, seconds, seed, repeat):
+    """Run a pattern ``repeat`` times and keep the fastest timing of each metric."""
+    runs = [bench_pattern(pattern, seconds, seed, duration=duration) for _ in range(repeat)]
+    best = dict(runs[0])
+    for metric in TIMED_METRICS:
+        best[metric] = min(run[metric] for run in runs)
+    return best
+
+
+def run_suite(seconds, stress_sizes=STRESS_SIZES, seed=0, repeat=3, script=None):
+    entries = list(default_level()[0])
+    if script:
+        entries += load_patterns(script)
+    entries.append((composite_demo(), seconds))
+    entries += [(StressPattern(size), seconds) for size in stress_sizes]
+    results = {pattern.__name__: best_of(pattern, duration, seconds, seed, repeat)
+               for pattern, duration in entries}
+    return {
+        "meta": {
+            "seconds": seconds,
+            "seed": seed,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            # ru_maxrss is KiB on Linux and bytes on macOS
+            "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, tolerance=0.10):
+    """Return a list of (pattern, metric, old, new) that got worse than tolerance allows."""
+    regressions = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        for metric in TIMED_METRICS + ("pool_peak_bytes",):
+            if metric in old and new[metric] > old[metric] * (1 + tolerance):
+                regressions.append((name, metric, old[metric], new[metric]))
+    return regressions
+
+
+def print_table(report):
+    header = (f"{'pattern':<22}{'spawn/s':>10}{'peak live':>11}{'spawn ns':>10}"
+              f"{'upd ns/laser':>14}{'coll ns/q':>11}{'pool KiB':>10}")
+    print(header)
+    for name, r in report["results"].items():
+        print(f"{name:<22}{r['spawn_rate_per_s']:>10.0f}{r['peak_live_lasers']:>11}"
+              f"{r['spawn_ns_per_laser']:>10.0f}{r['update_ns_per_laser']:>14.1f}"
+              f"{r['collision_ns_per_query']:>11.0f}{r['pool_peak_bytes'] / 1024:>10.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Laser pattern benchmark suite")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stress", type=int, nargs="*", default=STRESS_SIZES)
+    parser.add_argument("--script", metavar="PATH", help="also bench a compiled pattern file")
+    parser.add_argument("--repeat", type=int, default=3, help="keep the best of N runs")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="flag regressions against a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.seconds, args.stress, args.seed, args.repeat, args.script)
+    print_table(report)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=4)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.tolerance)
+        for name, metric, old, new in regressions:
+            print(f"REGRESSION {name}.{metric}: {old:.1f} -> {new:.1f} ({new / old - 1:+.0%})")
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Single entry point for the game and its tools.
+
+    python -m cli play
+    python -m cli bench --seconds 5
+    python -m cli replay replays/run.bhr --seek 600
+    python -m cli analyze --strict
+    python -m cli validate-settings [user_settings.json]
+    python -m cli --import-time validate-settings
+
+Each subcommand imports only the modules it needs when it runs, so the
+headless ones never pull in pygame and validate-settings skips NumPy too.
+``--import-time`` prints how long that import took.
+"""
+import argparse
+import importlib
+import sys
+import time
+
+# subcommand -> (module, help)
+COMMANDS = {
+    "play": ("main", "start the game"),
+    "bench": ("bench_patterns", "run the pattern benchmark suite"),
+    "replay": ("replay", "play back a recorded run"),
+    "analyze": ("safe_zones", "map safe zones and flag unwinnable patterns"),
+    "validate-settings": ("settings", "check a settings file for mistakes"),
+}
+
+
+def validate_settings(settings_module, argv):
+    import json
+    parser = argparse.ArgumentParser(prog="cli validate-settings")
+    parser.add_argument("path", nargs="?", default=settings_module.SETTINGS_FILE)
+    args = parser.parse_args(argv)
+    try:
+        with open(args.path) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"{args.path}: {e}")
+        return 1
+    if not isinstance(data, dict):
+        print(f"{args.path}: expected a JSON object")
+        return 1
+    problems = settings_module.validate_settings(data)
+    for problem in problems:
+        print(f"{args.path}: {problem}")
+    if problems:
+        return 1
+    print(f"{args.path}: ok")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cli", description=__doc__.splitlines()[0])
+    parser.add_argument("--import-time", action="store_true",
+                        help="report how long the subcommand's imports took")
+    parser.add_argument("command", choices=COMMANDS,
+                        help=", ".join(f"{name}: {help}" for name, (_, help) in COMMANDS.items()))
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    module = importlib.import_module(COMMANDS[args.command][0])
+    if args.import_time:
+        print(f"import {module.__name__}: {(time.perf_counter() - start) * 1000:.1f} ms",
+              file=sys.stderr)
+
+    if args.command == "play":
+        return module.main()
+    if args.command == "validate-settings":
+        return validate_settings(module, args.args)
+    return module.main(args.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import numpy as np
+
+
+def point_segment_distance(px, py, x, y, dx, dy):
+    """Distance from points (px, py) to segments starting at (x, y) with extent (dx, dy).
+
+    Arguments broadcast, so passing points shaped (m, 1) against segment
+    arrays shaped (n,) gives an (m, n) distance matrix.
+    """
+    rx = px - x
+    ry = py - y
+    seg_len2 = dx * dx + dy * dy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (rx * dx + ry * dy) / seg_len2
+    # Zero-length segments fall back to the distance to their start point
+    t = np.where(seg_len2 > 0, np.clip(t, 0.0, 1.0), 0.0)
+    return np.hypot(rx - t * dx, ry - t * dy)
+
+
+def segment_segment_distance(ax, ay, adx, ady, bx, by, bdx, bdy):
+    """Distance between segments starting at (ax, ay) and (bx, by) with extents
+    (adx, ady) and (bdx, bdy); arguments broadcast like point_segment_distance.
+
+    Vectorized form of the clamped closest-points method from Ericson's
+    Real-Time Collision Detection, 5.1.9.
+    """
+    rx = ax - bx
+    ry = ay - by
+    a = adx * adx + ady * ady
+    e = bdx * bdx + bdy * bdy
+    b = adx * bdx + ady * bdy
+    c = adx * rx + ady * ry
+    f = bdx * rx + bdy * ry
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = a * e - b * b
+        # Closest point on A's line to B's, then B's parameter for that point;
+        # parallel or degenerate cases fall back to s = 0
+        s = np.where(denom > 0, np.clip((b * f - c * e) / denom, 0.0, 1.0), 0.0)
+        t = np.where(e > 0, (b * s + f) / e, 0.0)
+        # Clamping t to an end of B (or B being a point) means recomputing s
+        # as the point of A closest to that end
+        s_start = np.where(a > 0, np.clip(-c / a, 0.0, 1.0), 0.0)
+        s_end = np.where(a > 0, np.clip((b - c) / a, 0.0, 1.0), 0.0)
+        s = np.where(t <= 0, s_start, np.where(t > 1, s_end, s))
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(rx + adx * s - bdx * t, ry + ady * s - bdy * t)
+
+
+def _candidates(pool, min_x, min_y, max_x, max_y, swept=False):
+    """Active slots whose bounding box overlaps the query box (broadphase).
+
+    With ``swept`` each laser's box covers both its previous and current
+    position, for queries over the whole last update.
+    """
+    if pool.index is not None:
+        pool.sync_index()
+        if swept and pool.count:
+            # The grid indexes current positions only
+            reach = pool.speed[:pool.count].max()
+            min_x, min_y, max_x, max_y = min_x - reach, min_y - reach, max_x + reach, max_y + reach
+        slots = pool.index.query(min_x, min_y, max_x, max_y)
+    else:
+        slots = np.flatnonzero(pool.active[:pool.count])
+    if slots.size == 0:
+        return slots
+    x = pool.x[slots]
+    y = pool.y[slots]
+    ex = x + pool.cos[slots] * pool.length[slots]
+    ey = y + pool.sin[slots] * pool.length[slots]
+    pad = pool.width[slots] // 2
+    if swept:
+        # Growing the box by the distance moved covers the previous position
+        pad = pad + pool.speed[slots]
+    keep = ((np.minimum(x, ex) - pad <= max_x) & (np.maximum(x, ex) + pad >= min_x) &
+            (np.minimum(y, ey) - pad <= max_y) & (np.maximum(y, ey) + pad >= min_y))
+    return slots[keep]
+
+
+def query_hits(pool, points, radius):
+    """Return, for each query point, the array of laser slots touching it.
+
+    ``points`` is a sequence of (x, y) pairs and ``radius`` is either a
+    scalar or one radius per point, so the player hitbox, extra players and
+    a grazing radius can all be tested in the same pass.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), (len(points),))
+    empty = np.empty(0, dtype=np.intp)
+    if len(points) == 0:
+        return []
+    px = points[:, 0]
+    py = points[:, 1]
+    slots = _candidates(pool, (px - radius).min(), (py - radius).min(),
+                        (px + radius).max(), (py + radius).max())
+    if slots.size == 0:
+        return [empty for _ in range(len(points))]
+    hit = _hit_matrix(pool, slots, px, py, radius)
+    return [slots[row] for row in hit]
+
+
+def first_hit(pool, x, y, radius):
+    """Return the first laser slot touching the circle at (x, y), or -1."""
+    slots = _candidates(pool, x - radius, y - radius, x + radius, y + radius)
+    if slots.size == 0:
+        return -1
+    hit = _hit_matrix(pool, slots, np.array([x], dtype=np.float64),
+                      np.array([y], dtype=np.float64), np.array([radius], dtype=np.float64))[0]
+    index = np.argmax(hit)
+    return int(slots[index]) if hit[index] else -1
+
+
+def first_swept_hit(pool, x0, y0, x1, y1, radius):
+    """Return the first laser slot the circle touches anywhere on its move from
+    (x0, y0) to (x1, y1) during the pool's last update, or -1.
+
+    Both the circle and each laser move in a straight line over the update,
+    so in the laser's frame the circle sweeps the segment from its start to
+    its end minus the laser's displacement. A hit is that capsule touching
+    the laser's segment at its previous position, which catches thin lasers
+    and dashes passing through each other between frames.
+    """
+    slots = _candidates(pool, min(x0, x1) - radius, min(y0, y1) - radius,
+                        max(x0, x1) + radius, max(y0, y1) + radius, swept=True)
+    if slots.size == 0:
+        return -1
+    lx = pool.prev_x[slots]
+    ly = pool.prev_y[slots]
+    length = pool.length[slots]
+    # Player path relative to each laser: start, and displacement minus the laser's
+    rdx = (x1 - x0) - (pool.x[slots] - lx)
+    rdy = (y1 - y0) - (pool.y[slots] - ly)
+    dist = segment_segment_distance(x0, y0, rdx, rdy, lx, ly,
+                                    pool.cos[slots] * length, pool.sin[slots] * length)
+    hit = dist <= radius + pool.width[slots] // 2
+    index = np.argmax(hit)
+    return int(slots[index]) if hit[index] else -1
+
+
+def _hit_matrix(pool, slots, px, py, radius):
+    length = pool.length[slots]
+    dist = point_segment_distance(px[:, None], py[:, None], pool.x[slots], pool.y[slots],
+                                  pool.cos[slots] * length, pool.sin[slots] * length)
+    return dist <= radius[:, None] + pool.width[slots] // 2
@@ -0,0 +1,267 @@
+"""Composable laser emitters evaluated in NumPy batches.
+
+A pattern is a tree of nodes. Leaves fire shots on a period and describe
+each shot's lasers as arrays; time modifiers wrap a node and remap the
+clock it sees. ``Pattern`` runs the tree once per frame, joins every
+leaf's batch and writes it to the pool in one ``spawn_many`` call::
+
+    storm = Pattern("storm", [
+        Spiral((640, 200), arms=3, spin=90, period=0.1, speed=5),
+        Time(Aimed((640, 0), count=3, spread=20, period=0.75), delay=2),
+        Burst((640, 400), count=24, period=1.5, color=GREEN),
+    ], max_live=2000)
+    LEVEL = [(storm, 10)]
+
+Angles are in degrees and times in seconds. ``Aimed`` shoots at the
+player, so Simulation passes patterns with ``aims = True`` the player's
+position as a fourth argument to ``emit``.
+"""
+import math
+
+import numpy as np
+
+from game_patterns import RED, BLUE, GREEN
+
+_EPS = 1e-9
+# A lower bound just before zero, so shots due at a clock's start fire
+_START = -1e-6
+
+
+class Batch:
+    """Lasers from one node for one frame. ``angle`` is an array; the other
+    fields are arrays of the same length or scalars shared by the batch."""
+
+    __slots__ = ("x", "y", "angle", "speed", "width", "length", "color")
+
+    def __init__(self, x, y, angle, speed, width, length, color):
+        self.x = x
+        self.y = y
+        self.angle = angle
+        self.speed = speed
+        self.width = width
+        self.length = length
+        self.color = color
+
+    def column(self, field):
+        value = getattr(self, field)
+        if isinstance(value, np.ndarray):
+            return value
+        return np.full(self.angle.size, value)
+
+
+class Emitter:
+    """Base for leaves: fires at ``phase + k * period`` seconds, k = 0, 1, ..."""
+
+    aims = False
+
+    def __init__(self, origin, period=1.0, phase=0.0, speed=6, width=4, length=32, color=RED):
+        self.origin = origin
+        self.period = period
+        self.phase = phase
+        self.speed = speed
+        self.width = width
+        self.length = length
+        self.color = color
+
+    def shot_times(self, t0, t1):
+        """Times of this emitter's shots in (t0, t1]."""
+        k0 = math.floor((t0 - self.phase) / self.period + _EPS)
+        k1 = math.floor((t1 - self.phase) / self.period + _EPS)
+        if k1 < 0 or k1 <= k0:
+            return None
+        return self.phase + np.arange(max(k0 + 1, 0), k1 + 1) * self.period
+
+    def emit(self, t0, t1, rng, target):
+        times = self.shot_times(t0, t1)
+        if times is None:
+            return None
+        x, y, angle = self.shots(times, rng, target)
+        return Batch(x, y, angle, self.speed, self.width, self.length, self.color)
+
+    def shots(self, times, rng, target):
+        """Return (x, y, angle in radians) arrays, or scalars for x and y."""
+        raise NotImplementedError
+
+
+class Spiral(Emitter):
+    """``arms`` evenly spaced lasers per shot, the whole star turning ``spin`` deg/s."""
+
+    def __init__(self, origin, arms=1, spin=90.0, angle=0.0, period=0.1, **kwargs):
+        super().__init__(origin, period, **kwargs)
+        self.fan = np.arange(arms) * (2 * math.pi / arms)
+        self.spin = math.radians(spin)
+        self.base = math.radians(angle)
+
+    def shots(self, times, rng, target):
+        angle = (self.base + self.spin * times)[:, None] + self.fan
+        return self.origin[0], self.origin[1], angle.ravel()
+
+
+class Aimed(Emitter):
+    """A fan of ``count`` lasers across ``spread`` degrees centred on the player."""
+
+    aims = True
+
+    def __init__(self, origin, count=1, spread=0.0, period=1.0, **kwargs):
+        super().__init__(origin, period, **kwargs)
+        spread = math.radians(spread)
+        self.fan = np.linspace(-spread / 2, spread / 2, count) if count > 1 else np.zeros(1)
+
+    def shots(self, times, rng, target):
+        ox, oy = self.origin
+        if target is None:
+            aim = math.pi / 2
+        else:
+            aim = math.atan2(target[1] - oy, target[0] - ox)
+        return ox, oy, np.tile(aim + self.fan, times.size)
+
+
+class Wave(Emitter):
+    """``count`` lasers spaced along the line ``start``-``end``, all heading
+    ``angle`` with a travelling sine wobble of ``amplitude`` degrees."""
+
+    def __init__(self, start, end, count=16, angle=90.0, amplitude=20.0, frequency=0.5,
+                 wavelength=1.0, period=0.5, **kwargs):
+        super().__init__(start, period, **kwargs)
+        along = np.linspace(0.0, 1.0, count)
+        self.xs = start[0] + (end[0] - start[0]) * along
+        self.ys = start[1] + (end[1] - start[1]) * along
+        self.offsets = along * (2 * math.pi / wavelength)
+        self.base = math.radians(angle)
+        self.amplitude = math.radians(amplitude)
+        self.omega = 2 * math.pi * frequency
+
+    def shots(self, times, rng, target):
+        wobble = np.sin(self.omega * times[:, None] + self.offsets)
+        angle = self.base + self.amplitude * wobble
+        n = times.size
+        return np.tile(self.xs, n), np.tile(self.ys, n), angle.ravel()
+
+
+class Burst(Emitter):
+    """``count`` lasers at random angles within ``spread`` degrees of ``angle``."""
+
+    def __init__(self, origin, count=12, angle=0.0, spread=360.0, period=1.5, **kwargs):
+        super().__init__(origin, period, **kwargs)
+        self.count = count
+        self.base = math.radians(angle)
+        self.spread = math.radians(spread)
+
+    def shots(self, times, rng, target):
+        # Draw from the simulation's RNG so runs stay reproducible from its seed
+        gen = np.random.default_rng(rng.getrandbits(64))
+        offsets = gen.uniform(-self.spread / 2, self.spread / 2, times.size * self.count)
+        return self.origin[0], self.origin[1], self.base + offsets
+
+
+class Time:
+    """Remap the clock a node sees.
+
+    The node starts ``delay`` seconds in, runs at ``scale`` times normal
+    speed, stops after ``duration`` seconds of its own time, and with
+    ``loop`` restarts its clock every ``loop`` seconds.
+    """
+
+    def __init__(self, node, delay=0.0, scale=1.0, duration=None, loop=None):
+        self.node = node
+        self.delay = delay
+        self.scale = scale
+        self.duration = duration
+        self.loop = loop
+        self.aims = node.aims
+
+    def _local(self, t):
+        return (t - self.delay) * self.scale
+
+    def emit(self, t0, t1, rng, target):
+        t0 = self._local(t0)
+        t1 = self._local(t1)
+        if t1 < 0:
+            return None
+        if self.loop is not None:
+            base = math.floor(t1 / self.loop) * self.loop
+            t0, t1 = t0 - base, t1 - base
+            if t0 < 0:
+                # The loop wrapped inside this frame; only count the new lap
+                t0 = _START
+        if self.duration is not None:
+            if t0 >= self.duration:
+                return None
+            t1 = min(t1, self.duration)
+        return self.node.emit(max(t0, _START), t1, rng, target)
+
+
+class Pattern:
+    """A named set of nodes, driven by PatternSwitcher like any other pattern.
+
+    ``max_live`` caps the pool's live lasers and ``max_per_frame`` caps a
+    single frame's spawns; shots over budget are dropped, later nodes first.
+    """
+
+    def __init__(self, name, nodes, fps=60, max_live=None, max_per_frame=None):
+        self.__name__ = name
+        self.name = name
+        self.nodes = list(nodes)
+        self.fps = fps
+        self.max_live = max_live
+        self.max_per_frame = max_per_frame
+        self.aims = any(node.aims for node in self.nodes)
+        self.dropped = 0
+        # frame -> indices of the nodes that fire on it. Firing depends only
+        # on time, so after the first lap idle nodes aren't evaluated at all
+        self._firing = {}
+
+    def emit(self, pool, frame, rng, target=None):
+        t1 = frame / self.fps
+        t0 = (frame - 1) / self.fps if frame > 1 else _START
+        firing = self._firing.get(frame)
+        if firing is None:
+            batches = [node.emit(t0, t1, rng, target) for node in self.nodes]
+            self._firing[frame] = tuple(i for i, b in enumerate(batches) if b is not None)
+            batches = [b for b in batches if b is not None]
+        elif not firing:
+            return
+        else:
+            nodes = self.nodes
+            batches = [nodes[i].emit(t0, t1, rng, target) for i in firing]
+        if not batches:
+            return
+        n = sum(b.angle.size for b in batches)
+        budget = n
+        if self.max_per_frame is not None:
+            budget = min(budget, self.max_per_frame)
+        if self.max_live is not None:
+            budget = min(budget, max(0, self.max_live - pool.live_owned()))
+        if budget < n:
+            self.dropped += n - budget
+            if budget == 0:
+                return
+        if len(batches) == 1 and budget == n:
+            b = batches[0]
+            pool.spawn_many(b.x, b.y, b.angle, b.speed, b.color, b.width, b.length)
+            return
+        color = np.concatenate([np.full(b.angle.size, pool.color_id(b.color), dtype=np.int16)
+                                for b in batches])
+        join = lambda field: np.concatenate([b.column(field) for b in batches])[:budget]
+        pool.spawn_many(join("x"), join("y"), join("angle"), join("speed"), color[:budget],
+                        join("width"), join("length"))
+
+
+def composite_demo(emitters=10, fps=60):
+    """A ten-emitter pattern mixing every node type, for benchmarks and tuning."""
+    nodes = []
+    for i in range(emitters):
+        x = 160 + (i * 960) // max(1, emitters - 1)
+        kind = i % 4
+        if kind == 0:
+            nodes.append(Spiral((x, 150), arms=3, spin=60 + 15 * i, period=0.25, speed=4, color=RED))
+        elif kind == 1:
+            nodes.append(Time(Aimed((x, 0), count=3, spread=24, period=1.0, speed=6, color=BLUE),
+                              delay=0.5 * i))
+        elif kind == 2:
+            nodes.append(Wave((x - 120, 0), (x + 120, 0), count=6, period=1.0, speed=3,
+                              color=GREEN, width=3, length=24))
+        else:
+            nodes.append(Time(Burst((x, 400), count=10, period=2.0, speed=4, color=GREEN),
+                              scale=1.5, loop=4.0))
+    return Pattern(f"emitters_{emitters}", nodes, fps=fps, max_live=4000)
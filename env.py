@@ -0,0 +1,270 @@
+"""Gym-style environments for bots and training loops, without pygame.
+
+    env = BulletHellEnv()
+    obs, info = env.reset(seed=0)
+    obs, reward, terminated, truncated, info = env.step(MOVE_LEFT | DASH)
+
+    envs = VecEnv(256, seed=0)
+    obs, info = envs.reset()
+    obs, reward, terminated, truncated, info = envs.step(actions)
+
+Actions are the input masks from simulation.py (0 to 31). Both classes
+follow the Gymnasium API but don't import it. An observation is a float32
+vector: a downsampled occupancy raster of the playfield (CELL pixel
+cells, 1.0 where part of a laser is) followed by the player's x and y
+scaled to 0-1 and the dash cooldown scaled to 0-1. Reward is 1.0 for
+each step survived. An episode terminates on a hit and is truncated
+after ``max_steps``, which defaults to one pass through the level.
+``patterns`` defaults to the level the game plays.
+
+VecEnv steps N environments in lockstep. All their lasers live in one
+shared LaserPool, tagged by environment, so moving lasers, swept
+collision and rasterizing are each one NumPy pass over the whole batch;
+only pattern spawning runs per environment. Players are arrays too.
+Finished environments reset on the next seed automatically, and their
+last observation is returned in ``info["final_observation"]``. Each
+environment matches a Simulation with the same seed and inputs frame for
+frame.
+"""
+import random
+
+import numpy as np
+
+from collision import segment_segment_distance
+from game_patterns import PatternSwitcher
+from laser_pool import LaserPool
+from pattern_scripts import default_level
+from player import Player, WIDTH, HEIGHT
+from simulation import Simulation, ACTIONS, DASH, run_pattern
+
+CELL = 40
+RASTER_SHAPE = (HEIGHT // CELL, WIDTH // CELL)
+OBS_SIZE = RASTER_SHAPE[0] * RASTER_SHAPE[1] + 3
+
+
+def _directions(dash):
+    """Per input mask (dx, dy) arrays, matching Player.handle_input and Player.dash."""
+    dx = np.zeros(1 << len(ACTIONS))
+    dy = np.zeros(1 << len(ACTIONS))
+    for mask in range(dx.size):
+        x = (mask >> 1 & 1) - (mask & 1)
+        y = (mask >> 3 & 1) - (mask >> 2 & 1)
+        if dash and x == 0 and y == 0:
+            y = -1
+        if x != 0 and y != 0:
+            dx[mask], dy[mask] = x * 0.7071, y * 0.7071
+        else:
+            dx[mask], dy[mask] = x, y
+    return dx, dy
+
+
+_MOVE_DX, _MOVE_DY = _directions(dash=False)
+_DASH_DX, _DASH_DY = _directions(dash=True)
+
+
+def observe(pool, x, y, dash_timer, dash_cooldown, out=None):
+    """Observations for players at arrays (x, y), one per pool owner id.
+
+    Each laser is rasterized at points along its length spaced at most a
+    cell apart, so it marks every cell its centre line crosses.
+    """
+    n = len(x)
+    rows, cols = RASTER_SHAPE
+    cells = rows * cols
+    if out is None:
+        out = np.empty((n, OBS_SIZE), dtype=np.float32)
+    out[:, :cells] = 0.0
+    slots = pool.active_slots()
+    if slots.size:
+        length = pool.length[slots]
+        samples = int(np.ceil(length.max() / CELL)) + 1
+        t = np.linspace(0.0, 1.0, samples)
+        px = (pool.x[slots, None] + (pool.cos[slots] * length)[:, None] * t) // CELL
+        py = (pool.y[slots, None] + (pool.sin[slots] * length)[:, None] * t) // CELL
+        inside = (px >= 0) & (px < cols) & (py >= 0) & (py < rows)
+        owner = np.broadcast_to(pool.owner[slots, None], inside.shape)[inside]
+        flat = owner * cells + py[inside].astype(np.int64) * cols + px[inside].astype(np.int64)
+        out.reshape(-1)[flat // cells * OBS_SIZE + flat % cells] = 1.0
+    out[:, cells] = np.asarray(x) / WIDTH
+    out[:, cells + 1] = np.asarray(y) / HEIGHT
+    out[:, cells + 2] = np.asarray(dash_timer) / dash_cooldown
+    return out
+
+
+def _level_steps(patterns, fps):
+    return int(round(sum(duration for _, duration in patterns) * fps))
+
+
+class BulletHellEnv:
+    """One Simulation behind the Gymnasium reset/step API."""
+
+    def __init__(self, patterns=None, fps=60, max_steps=None):
+        if patterns is None:
+            patterns = default_level(fps)[0]
+        self.patterns = patterns
+        self.fps = fps
+        self.max_steps = _level_steps(patterns, fps) if max_steps is None else max_steps
+        self.sim = None
+
+    def _observe(self):
+        player = self.sim.player
+        return observe(self.sim.lasers, [player.x], [player.y], [player.dash_timer],
+                       player.dash_cooldown)[0]
+
+    def reset(self, seed=None):
+        self.sim = Simulation(seed, patterns=self.patterns, fps=self.fps)
+        return self._observe(), {"seed": self.sim.seed}
+
+    def step(self, action):
+        alive = self.sim.step(int(action))
+        terminated = not alive
+        truncated = alive and self.sim.frame >= self.max_steps
+        return (self._observe(), 1.0 if alive else 0.0, terminated, truncated,
+                {"frame": self.sim.frame})
+
+
+class VecEnv:
+    """``num_envs`` environments stepped together over one shared laser batch."""
+
+    def __init__(self, num_envs, seed=0, patterns=None, fps=60, max_steps=None,
+                 width=WIDTH, height=HEIGHT):
+        if patterns is None:
+            patterns = default_level(fps)[0]
+        self.num_envs = num_envs
+        self.patterns = patterns
+        self.fps = fps
+        self.max_steps = _level_steps(patterns, fps) if max_steps is None else max_steps
+        self.width = width
+        self.height = height
+        # Tuning comes from Player so the two never drift apart
+        template = Player(width // 2, height // 2)
+        self.speed = template.speed
+        self.radius = template.radius
+        self.hitbox_radius = template.hitbox_radius
+        self.dash_distance = template.dash_distance
+        self.dash_cooldown = template.dash_cooldown
+
+        self.lasers = LaserPool()
+        self.lasers.track_owners(num_envs)
+        self.x = np.zeros(num_envs)
+        self.y = np.zeros(num_envs)
+        self.prev_x = np.zeros(num_envs)
+        self.prev_y = np.zeros(num_envs)
+        self.dash_timer = np.zeros(num_envs, dtype=np.int64)
+        self.frame = np.zeros(num_envs, dtype=np.int64)
+        self.seeds = np.zeros(num_envs, dtype=np.int64)
+        self.rngs = [None] * num_envs
+        self.switchers = [None] * num_envs
+        self.next_seed = seed
+        self._obs = np.empty((num_envs, OBS_SIZE), dtype=np.float32)
+
+    def _reset_env(self, i, seed):
+        pool = self.lasers
+        n = pool.count
+        mine = np.flatnonzero(pool.active[:n] & (pool.owner[:n] == i))
+        if mine.size:
+            pool.kill(mine)
+        self.x[i] = self.prev_x[i] = self.width // 2
+        self.y[i] = self.prev_y[i] = self.height // 2
+        self.dash_timer[i] = 0
+        self.frame[i] = 0
+        self.seeds[i] = seed
+        self.rngs[i] = random.Random(seed)
+        self.switchers[i] = PatternSwitcher(self.patterns, fps=self.fps)
+
+    def _observe(self):
+        return observe(self.lasers, self.x, self.y, self.dash_timer, self.dash_cooldown,
+                       out=self._obs).copy()
+
+    def reset(self, seed=None):
+        """Reset every environment; env i gets seed ``seed + i``."""
+        if seed is not None:
+            self.next_seed = seed
+        for i in range(self.num_envs):
+            self._reset_env(i, self.next_seed)
+            self.next_seed += 1
+        return self._observe(), {"seed": self.seeds.copy()}
+
+    def _move(self, actions):
+        x, y = self.x, self.y
+        self.prev_x[:] = x
+        self.prev_y[:] = y
+        lo, hi = self.radius, (self.width - self.radius, self.height - self.radius)
+        dashing = ((actions & DASH) != 0) & (self.dash_timer == 0)
+        if dashing.any():
+            x[dashing] = np.clip(x[dashing] + _DASH_DX[actions[dashing]] * self.dash_distance,
+                                 lo, hi[0])
+            y[dashing] = np.clip(y[dashing] + _DASH_DY[actions[dashing]] * self.dash_distance,
+                                 lo, hi[1])
+            self.dash_timer[dashing] = self.dash_cooldown
+        np.clip(x + _MOVE_DX[actions] * self.speed, lo, hi[0], out=x)
+        np.clip(y + _MOVE_DY[actions] * self.speed, lo, hi[1], out=y)
+        np.subtract(self.dash_timer, 1, out=self.dash_timer, where=self.dash_timer > 0)
+
+    def _spawn(self):
+        pool = self.lasers
+        x, y = self.x.tolist(), self.y.tolist()
+        for i in range(self.num_envs):
+            pattern, pattern_frame = self.switchers[i].get_current_pattern()
+            pool.current_owner = i
+            run_pattern(pattern, pool, pattern_frame, self.rngs[i], (x[i], y[i]))
+        pool.current_owner = 0
+
+    def _hits(self):
+        """Per environment, whether any of its lasers touched its player this step.
+
+        The same broadphase and swept test as collision.first_swept_hit,
+        done for every laser against its own environment's player at once.
+        """
+        pool = self.lasers
+        slots = pool.active_slots()
+        hit = np.zeros(self.num_envs, dtype=bool)
+        if slots.size == 0:
+            return hit
+        owner = pool.owner[slots]
+        r = self.hitbox_radius
+        x0, y0 = self.prev_x[owner], self.prev_y[owner]
+        x1, y1 = self.x[owner], self.y[owner]
+        lx, ly = pool.x[slots], pool.y[slots]
+        length = pool.length[slots]
+        dx = pool.cos[slots] * length
+        dy = pool.sin[slots] * length
+        pad = pool.width[slots] // 2 + pool.speed[slots]
+        near = ((np.minimum(lx, lx + dx) - pad <= np.maximum(x0, x1) + r) &
+                (np.maximum(lx, lx + dx) + pad >= np.minimum(x0, x1) - r) &
+                (np.minimum(ly, ly + dy) - pad <= np.maximum(y0, y1) + r) &
+                (np.maximum(ly, ly + dy) + pad >= np.minimum(y0, y1) - r))
+        if not near.any():
+            return hit
+        slots, owner = slots[near], owner[near]
+        x0, y0, x1, y1 = x0[near], y0[near], x1[near], y1[near]
+        px, py = pool.prev_x[slots], pool.prev_y[slots]
+        rdx = (x1 - x0) - (pool.x[slots] - px)
+        rdy = (y1 - y0) - (pool.y[slots] - py)
+        dist = segment_segment_distance(x0, y0, rdx, rdy, px, py, dx[near], dy[near])
+        hit[owner[dist <= r + pool.width[slots] // 2]] = True
+        return hit
+
+    def step(self, actions):
+        """Advance every environment one frame with an array of input masks."""
+        actions = np.asarray(actions, dtype=np.int64)
+        self._move(actions)
+        self._spawn()
+        self.lasers.update()
+        self.frame += 1
+        terminated = self._hits()
+        truncated = ~terminated & (self.frame >= self.max_steps)
+        reward = (~terminated).astype(np.float32)
+        obs = self._observe()
+        info = {}
+        done = np.flatnonzero(terminated | truncated)
+        if done.size:
+            info["final_observation"] = obs[done].copy()
+            info["final_frame"] = self.frame[done].copy()
+            info["done_envs"] = done
+            for i in done.tolist():
+                self._reset_env(i, self.next_seed)
+                self.next_seed += 1
+            obs[done] = observe(self.lasers, self.x, self.y, self.dash_timer,
+                                self.dash_cooldown)[done]
+        return obs, reward, terminated, truncated, info
@@ -0,0 +1,143 @@
+"""Estimate how hard each level pattern is from many seeded headless runs.
+
+    python evaluate.py --episodes 2000 --seconds 30 --bot random --save difficulty.npz
+
+Every pattern runs alone (looping at its level duration) for ``episodes``
+seeds, spread over a process pool. Per pattern it reports survival time,
+where the player got hit and where lasers passed within ``--near`` pixels
+of the hitbox without touching it. Workers load the pattern list once and
+are handed pattern indices and seed ranges, and send back a few NumPy
+arrays per batch rather than per-frame data.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from collision import first_hit
+from headless import BOTS
+from player import WIDTH, HEIGHT
+from pattern_scripts import default_level
+from replay import pattern_source, resolve_patterns
+from simulation import Simulation
+
+# Heatmap cells are this many pixels square
+CELL = 32
+GRID_SHAPE = (HEIGHT // CELL, WIDTH // CELL)
+
+_patterns = None
+
+
+def _init_worker(source, fps):
+    global _patterns
+    _patterns = resolve_patterns(source, fps)
+
+
+def run_batch(pattern_index, seeds, frames, bot="random", fps=60, near=12):
+    """Run one episode per seed on a single pattern; return compact results.
+
+    Returns ``(survival, hits, near_misses)``: frames survived per episode
+    (``frames`` means it never died) and two int32 heatmaps over GRID_SHAPE.
+    """
+    pattern, duration = _patterns[pattern_index]
+    survival = np.empty(len(seeds), dtype=np.int32)
+    hits = np.zeros(GRID_SHAPE, dtype=np.int32)
+    near_misses = np.zeros(GRID_SHAPE, dtype=np.int32)
+    rows, cols = GRID_SHAPE
+    for i, seed in enumerate(seeds):
+        sim = Simulation(seed, patterns=[(pattern, duration)], fps=fps)
+        policy = BOTS[bot](seed)
+        player = sim.player
+        graze = player.hitbox_radius + near
+        for _ in range(frames):
+            alive = sim.step(policy(sim))
+            cell = (min(max(int(player.y) // CELL, 0), rows - 1),
+                    min(max(int(player.x) // CELL, 0), cols - 1))
+            if not alive:
+                hits[cell] += 1
+                break
+            if first_hit(sim.lasers, player.x, player.y, graze) >= 0:
+                near_misses[cell] += 1
+        survival[i] = sim.frame
+    return survival, hits, near_misses
+
+
+def evaluate(episodes=1000, seconds=30, bot="random", fps=60, near=12, seed=0,
+             source=None, workers=None, batch_size=50):
+    """Evaluate every pattern in ``source`` (default: the level the game plays);
+    return {name: result dict}."""
+    if source is None:
+        source = pattern_source(default_level(fps)[1])
+    patterns = resolve_patterns(source, fps)
+    frames = int(seconds * fps)
+    jobs = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(source, fps)) as pool:
+        for index in range(len(patterns)):
+            for start in range(0, episodes, batch_size):
+                seeds = range(seed + start, seed + min(start + batch_size, episodes))
+                jobs.append((index, pool.submit(run_batch, index, seeds, frames, bot, fps, near)))
+        parts = {}
+        for index, future in jobs:
+            parts.setdefault(index, []).append(future.result())
+
+    results = {}
+    for index, batches in parts.items():
+        pattern, _ = patterns[index]
+        survival = np.concatenate([b[0] for b in batches])
+        hits = sum(b[1] for b in batches)
+        near_misses = sum(b[2] for b in batches)
+        results[pattern.__name__] = {
+            "survival": survival,
+            "hits": hits,
+            "near_misses": near_misses,
+            "survival_rate": float(np.mean(survival >= frames)),
+            "median_seconds": float(np.median(survival)) / fps,
+            "near_misses_per_second": float(near_misses.sum()) / max(1, survival.sum()) * fps,
+        }
+    return results
+
+
+def save(results, path):
+    arrays = {}
+    for name, r in results.items():
+        for key in ("survival", "hits", "near_misses"):
+            arrays[f"{name}.{key}"] = r[key]
+    np.savez_compressed(path, **arrays)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pattern difficulty evaluator")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=30, help="episode length cap")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="random")
+    parser.add_argument("--near", type=float, default=12, help="near-miss distance in pixels")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--script", metavar="PATH", help="evaluate a pattern file instead")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=50, help="episodes per task")
+    parser.add_argument("--save", metavar="PATH", help="write survival and heatmaps as .npz")
+    args = parser.parse_args(argv)
+
+    source = pattern_source(os.path.abspath(args.script)) if args.script else None
+    start = time.perf_counter()
+    results = evaluate(args.episodes, args.seconds, args.bot, near=args.near, seed=args.seed,
+                       source=source, workers=args.workers, batch_size=args.batch)
+    elapsed = time.perf_counter() - start
+    print(f"{'pattern':<22}{'survive':>9}{'median s':>10}{'near/s':>8}  hottest hit cell")
+    for name, r in results.items():
+        hot = np.unravel_index(np.argmax(r["hits"]), GRID_SHAPE)
+        where = f"({hot[1] * CELL}, {hot[0] * CELL})" if r["hits"].any() else "-"
+        print(f"{name:<22}{r['survival_rate']:>9.1%}{r['median_seconds']:>10.1f}"
+              f"{r['near_misses_per_second']:>8.2f}  {where}")
+    frames = sum(int(r["survival"].sum()) for r in results.values())
+    print(f"{frames:,} frames in {elapsed:.1f}s ({frames / elapsed:,.0f} frames/s, {args.workers} workers)")
+    if args.save:
+        save(results, args.save)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
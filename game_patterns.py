@@ -7,8 +7,25 @@ RED = (200, 0, 0)
 BLUE = (0, 120, 215)
 GREEN = (0, 200, 0)
 
+# Pattern functions are called once per simulation tick
+TICK_RATE = 60
+
+def every(frame, seconds):
+    """True on the ticks of a shot repeating every ``seconds``."""
+    return frame % max(1, round(seconds * TICK_RATE)) == 0
+
 class Laser:
+    __slots__ = ("x", "y", "angle", "speed", "color", "width", "length", "active", "pooled")
+
+    # Released lasers wait here to be reused by acquire(), so bursty patterns
+    # recycle objects instead of feeding the garbage collector
+    free_list = []
+    max_free = 4096
+
     def __init__(self, x, y, angle, speed=6, color=RED, width=4, length=32):
+        self.reset(x, y, angle, speed, color, width, length)
+
+    def reset(self, x, y, angle, speed=6, color=RED, width=4, length=32):
         self.x = x
         self.y = y
         self.angle = angle
@@ -17,6 +34,25 @@ class Laser:
         self.width = width
         self.length = length
         self.active = True
+        self.pooled = False
+
+    @classmethod
+    def acquire(cls, x, y, angle, speed=6, color=RED, width=4, length=32):
+        free_list = cls.free_list
+        if free_list:
+            laser = free_list.pop()
+            laser.reset(x, y, angle, speed, color, width, length)
+            return laser
+        return cls(x, y, angle, speed, color, width, length)
+
+    def release(self):
+        """Hand the laser back for reuse; it must not be used afterwards."""
+        if self.pooled:
+            return
+        self.active = False
+        self.pooled = True
+        if len(self.free_list) < self.max_free:
+            self.free_list.append(self)
 
     def update(self):
         self.x += math.cos(self.angle) * self.speed
@@ -31,28 +67,28 @@ class Laser:
         end_y = self.y + math.sin(self.angle) * self.length
         pygame.draw.line(surface, self.color, (self.x, self.y), (end_x, end_y), self.width)
 
-def pattern_simple_radial(frame):
+def pattern_simple_radial(frame, rng=random):
     lasers = []
-    if frame % 60 == 0:
+    if every(frame, 1.0):
         center_x, center_y = WIDTH // 2, 100
         for i in range(8):
             angle = i * (2 * math.pi / 8)
-            lasers.append(Laser(center_x, center_y, angle))
+            lasers.append(Laser.acquire(center_x, center_y, angle))
     return lasers
 
-def pattern_sweeping(frame):
+def pattern_sweeping(frame, rng=random):
     lasers = []
-    if frame % 10 == 0:
-        angle = math.pi / 2 + math.sin(frame / 60) * math.pi / 4
-        lasers.append(Laser(random.randint(100, WIDTH-100), 0, angle, speed=8, color=BLUE, width=6, length=48))
+    if every(frame, 1 / 6):
+        angle = math.pi / 2 + math.sin(frame / TICK_RATE) * math.pi / 4
+        lasers.append(Laser.acquire(rng.randint(100, WIDTH-100), 0, angle, speed=8, color=BLUE, width=6, length=48))
     return lasers
 
-def pattern_random_burst(frame):
+def pattern_random_burst(frame, rng=random):
     lasers = []
-    if frame % 90 == 0:
+    if every(frame, 1.5):
         for _ in range(12):
-            angle = random.uniform(0, 2 * math.pi)
-            lasers.append(Laser(WIDTH//2, HEIGHT//2, angle, speed=4, color=GREEN, width=3, length=24))
+            angle = rng.uniform(0, 2 * math.pi)
+            lasers.append(Laser.acquire(WIDTH//2, HEIGHT//2, angle, speed=4, color=GREEN, width=3, length=24))
     return lasers
 
 LEVEL_PATTERNS = [
@@ -0,0 +1,73 @@
+"""Run the game simulation without a display, as fast as the CPU allows.
+
+    python headless.py --frames 100000 --seed 7 --bot random
+"""
+import argparse
+import random
+import time
+
+from simulation import Simulation, ACTIONS, DASH
+
+
+class IdleBot:
+    def __init__(self, seed=0):
+        pass
+
+    def __call__(self, sim):
+        return 0
+
+
+class RandomBot:
+    """Hold a random direction for a while, dashing now and then."""
+
+    def __init__(self, seed=0, hold_frames=15, dash_chance=0.02):
+        self.rng = random.Random(seed)
+        self.hold_frames = hold_frames
+        self.dash_chance = dash_chance
+        self.mask = 0
+
+    def __call__(self, sim):
+        if sim.frame % self.hold_frames == 0:
+            self.mask = self.rng.getrandbits(len(ACTIONS) - 1)
+        if self.rng.random() < self.dash_chance:
+            return self.mask | DASH
+        return self.mask
+
+
+BOTS = {"idle": IdleBot, "random": RandomBot}
+
+
+def run_headless(frames, seed=0, bot=IdleBot, restart=True):
+    """Step a simulation for ``frames`` frames and return (sim, deaths, seconds).
+
+    ``bot`` is a factory called with the run's seed that returns a callable
+    mapping the simulation to an input mask. With ``restart`` a death starts
+    a fresh run seeded ``seed + deaths`` so soak tests use the whole budget.
+    """
+    deaths = 0
+    sim, policy = Simulation(seed), bot(seed)
+    start = time.perf_counter()
+    for _ in range(frames):
+        if not sim.step(policy(sim)):
+            deaths += 1
+            if not restart:
+                break
+            sim, policy = Simulation(seed + deaths), bot(seed + deaths)
+    return sim, deaths, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless bullet hell soak test")
+    parser.add_argument("--frames", type=int, default=36_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bot", choices=sorted(BOTS), default="random")
+    args = parser.parse_args(argv)
+
+    sim, deaths, elapsed = run_headless(args.frames, args.seed, BOTS[args.bot])
+    print(f"{args.frames} frames in {elapsed:.2f}s "
+          f"({args.frames / elapsed:,.0f} frames/s), {deaths} deaths, "
+          f"{len(sim.lasers)} live lasers at end")
+
+
+if __name__ == "__main__":
+    main()
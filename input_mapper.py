@@ -0,0 +1,141 @@
+import pygame
+
+from settings import parse_pad_spec
+from simulation import ACTIONS, DASH
+
+# Stick deflection needed before an axis counts as a held direction
+AXIS_DEADZONE = 0.5
+
+HAT_DIRECTIONS = {"left": (0, -1), "right": (0, 1), "down": (1, -1), "up": (1, 1)}
+
+
+def resolve_key(name):
+    """Turn a key name from the settings file into a pygame key constant."""
+    try:
+        return getattr(pygame, f'K_{name.lower()}')
+    except AttributeError:
+        # fallback for special keys
+        return pygame.key.key_code(name)
+
+
+class InputMapper:
+    """Turns keyboard and gamepad state into simulation input masks.
+
+    Bindings are resolved to key constants once, in ``sync``, instead of
+    on every frame. ``poll`` returns the held movement bits plus
+    DASH if a dash key or button went down since the previous poll; feed
+    events to ``handle_event`` so those presses are seen.
+
+    Gamepad bindings map an action to one spec or a list of them:
+    ``"axis:<n>:-"``/``"axis:<n>:+"``, ``"hat:<n>:left|right|up|down"``
+    and ``"button:<n>"``.
+    """
+
+    def __init__(self):
+        self.key_bindings = {}
+        self.gamepad_bindings = {}
+        self.joysticks = {}
+        self._keys = ()
+        self._dash_keys = frozenset()
+        self._axes = ()
+        self._hats = ()
+        self._buttons = ()
+        self._dash_buttons = frozenset()
+        self._dash = False
+
+    def sync(self, settings):
+        """Recompile if the settings' bindings differ from the compiled ones."""
+        keys = settings.get("key_bindings", {})
+        pads = settings.get("gamepad_bindings", {})
+        if keys != self.key_bindings or pads != self.gamepad_bindings:
+            self.compile(keys, pads)
+
+    def compile(self, key_bindings, gamepad_bindings=None):
+        self.key_bindings = dict(key_bindings)
+        self.gamepad_bindings = dict(gamepad_bindings or {})
+        bits = {action: 1 << i for i, action in enumerate(ACTIONS)}
+        keys = []
+        dash_keys = set()
+        for action, name in self.key_bindings.items():
+            if action not in bits:
+                continue
+            try:
+                key = resolve_key(name)
+            except ValueError:
+                continue
+            if bits[action] == DASH:
+                dash_keys.add(key)
+            else:
+                keys.append((bits[action], key))
+        axes, hats, buttons, dash_buttons = [], [], [], set()
+        # Malformed specs are skipped like unknown key names;
+        # validate-settings reports them
+        pad_specs = [(action, parsed) for action, specs in self.gamepad_bindings.items()
+                     if action in bits and isinstance(specs, (str, list))
+                     for parsed in map(parse_pad_spec, [specs] if isinstance(specs, str) else specs)
+                     if parsed is not None]
+        for action, (kind, index, arg) in pad_specs:
+            if kind == "axis":
+                axes.append((bits[action], index, -1 if arg == "-" else 1))
+            elif kind == "hat":
+                axis, sign = HAT_DIRECTIONS[arg]
+                hats.append((bits[action], index, axis, sign))
+            elif bits[action] == DASH:
+                dash_buttons.add(index)
+            else:
+                buttons.append((bits[action], index))
+        self._keys = tuple(keys)
+        self._dash_keys = frozenset(dash_keys)
+        self._axes = tuple(axes)
+        self._hats = tuple(hats)
+        self._buttons = tuple(buttons)
+        self._dash_buttons = frozenset(dash_buttons)
+        if pad_specs and pygame.joystick.get_init():
+            # Pads plugged in before the game started sent their
+            # JOYDEVICEADDED events to the menus, so open them here
+            for index in range(pygame.joystick.get_count()):
+                joystick = pygame.joystick.Joystick(index)
+                self.joysticks[joystick.get_instance_id()] = joystick
+
+    def reset(self):
+        self._dash = False
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key in self._dash_keys:
+                self._dash = True
+        elif event.type == pygame.JOYBUTTONDOWN:
+            if event.button in self._dash_buttons:
+                self._dash = True
+        elif event.type == pygame.JOYDEVICEADDED:
+            joystick = pygame.joystick.Joystick(event.device_index)
+            self.joysticks[joystick.get_instance_id()] = joystick
+        elif event.type == pygame.JOYDEVICEREMOVED:
+            self.joysticks.pop(event.instance_id, None)
+
+    def poll(self):
+        pressed = pygame.key.get_pressed()
+        mask = 0
+        for bit, key in self._keys:
+            if pressed[key]:
+                mask |= bit
+        if self.joysticks:
+            for joystick in self.joysticks.values():
+                mask |= self._poll_joystick(joystick)
+        if self._dash:
+            mask |= DASH
+            self._dash = False
+        return mask
+
+    def _poll_joystick(self, joystick):
+        mask = 0
+        for bit, axis, sign in self._axes:
+            if axis < joystick.get_numaxes() and joystick.get_axis(axis) * sign > AXIS_DEADZONE:
+                mask |= bit
+        for bit, hat, index, sign in self._hats:
+            if hat < joystick.get_numhats() and joystick.get_hat(hat)[index] == sign:
+                mask |= bit
+        for bit, button in self._buttons:
+            if button < joystick.get_numbuttons() and joystick.get_button(button):
+                mask |= bit
+        return mask
@@ -0,0 +1,293 @@
+import numpy as np
+
+from game_patterns import WIDTH, HEIGHT, RED
+
+
+class LaserPool:
+    """Structure-of-arrays storage for lasers, updated in one vectorized step.
+
+    Dead slots are pushed on a free list and reused by later spawns, so the
+    arrays only grow to the peak number of simultaneous lasers.
+
+    Several simulations can share one pool: each laser records the
+    ``current_owner`` it was spawned under, and ``track_owners`` keeps a
+    live count per owner.
+    """
+
+    def __init__(self, capacity=1024, width=WIDTH, height=HEIGHT):
+        self.bounds = (width, height)
+        self.capacity = 0
+        self.count = 0          # high-water slot index, slots >= count are unused
+        self.live = 0
+        self.spawned = 0        # lifetime total, for spawn-rate stats
+        self.free = []
+        self.palette = []
+        self._color_index = {}
+        self.index = None       # optional broadphase, see spatial_grid.SpatialGrid
+        self.index_stale = False
+        self.current_owner = 0
+        self.owner_live = None  # live lasers per owner, see track_owners
+        self._shared = False    # arrays are also held by a snapshot, see _unshare
+        self._allocate(capacity)
+
+    def attach_index(self, index):
+        self.index = index
+        index.sync(self)
+        self.index_stale = False
+
+    def sync_index(self):
+        if self.index is not None and self.index_stale:
+            self.index.sync(self)
+            self.index_stale = False
+
+    def _allocate(self, capacity):
+        def grow(old, dtype):
+            arr = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                arr[:self.capacity] = old[:self.capacity]
+            return arr
+
+        get = lambda name: getattr(self, name, None)
+        self.x = grow(get("x"), np.float64)
+        self.y = grow(get("y"), np.float64)
+        self.angle = grow(get("angle"), np.float64)
+        self.speed = grow(get("speed"), np.float64)
+        self.width = grow(get("width"), np.int32)
+        self.length = grow(get("length"), np.float64)
+        self.color = grow(get("color"), np.int16)
+        self.active = grow(get("active"), np.bool_)
+        self.cos = grow(get("cos"), np.float64)
+        self.sin = grow(get("sin"), np.float64)
+        # Positions before the last update, for render interpolation
+        self.prev_x = grow(get("prev_x"), np.float64)
+        self.prev_y = grow(get("prev_y"), np.float64)
+        self.owner = grow(get("owner"), np.int32)
+        self.capacity = capacity
+
+    def track_owners(self, owners):
+        """Keep a live count for each owner id in range(owners)."""
+        self.owner_live = np.zeros(owners, dtype=np.int64)
+        n = self.count
+        active = self.active[:n]
+        np.add.at(self.owner_live, self.owner[:n][active], 1)
+
+    def live_owned(self):
+        """Live lasers of ``current_owner``; all of them if owners aren't tracked."""
+        if self.owner_live is None:
+            return self.live
+        return int(self.owner_live[self.current_owner])
+
+    def _unshare(self):
+        """Copy arrays a snapshot still holds before the first write to them."""
+        if self._shared:
+            for name in self._FIELDS:
+                setattr(self, name, getattr(self, name).copy())
+            self.free = list(self.free)
+            self._shared = False
+
+    def color_id(self, color):
+        index = self._color_index.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self._color_index[color] = index
+        return index
+
+    def _take_slots(self, n):
+        reused = self.free[-n:] if n else []
+        if reused:
+            del self.free[-len(reused):]
+        fresh = n - len(reused)
+        if self.count + fresh > self.capacity:
+            capacity = self.capacity
+            while self.count + fresh > capacity:
+                capacity *= 2
+            self._allocate(capacity)
+        slots = np.empty(n, dtype=np.intp)
+        slots[:len(reused)] = reused
+        slots[len(reused):] = np.arange(self.count, self.count + fresh)
+        self.count += fresh
+        return slots
+
+    def spawn(self, x, y, angle, speed=6, color=RED, width=4, length=32):
+        return self.spawn_many(x, y, [angle], speed, color, width, length)[0]
+
+    def spawn_many(self, x, y, angle, speed=6, color=RED, width=4, length=32):
+        """Spawn one laser per entry of ``angle``; other fields broadcast."""
+        angle = np.asarray(angle, dtype=np.float64).ravel()
+        n = angle.size
+        if n == 0:
+            return np.empty(0, dtype=np.intp)
+        self._unshare()
+        slots = self._take_slots(n)
+        self.x[slots] = x
+        self.y[slots] = y
+        self.prev_x[slots] = x
+        self.prev_y[slots] = y
+        self.angle[slots] = angle
+        self.speed[slots] = speed
+        self.width[slots] = width
+        self.length[slots] = length
+        if isinstance(color, tuple):
+            self.color[slots] = self.color_id(color)
+        elif isinstance(color, np.ndarray):
+            self.color[slots] = color   # ids already from color_id()
+        else:
+            self.color[slots] = [self.color_id(tuple(c)) for c in color]
+        self.cos[slots] = np.cos(angle)
+        self.sin[slots] = np.sin(angle)
+        self.active[slots] = True
+        self.owner[slots] = self.current_owner
+        if self.owner_live is not None:
+            self.owner_live[self.current_owner] += n
+        self.live += n
+        self.spawned += n
+        self.index_stale = True
+        return slots
+
+    def extend(self, lasers):
+        """Copy ``game_patterns.Laser`` objects into the pool and release them."""
+        for laser in lasers:
+            self.spawn(laser.x, laser.y, laser.angle, laser.speed,
+                       laser.color, laser.width, laser.length)
+            laser.release()
+
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        self._unshare()
+        active = self.active[:n]
+        # Dead slots have zero speed, so the whole range moves branch-free
+        x = self.x[:n]
+        y = self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += self.cos[:n] * self.speed[:n]
+        y += self.sin[:n] * self.speed[:n]
+        length = self.length[:n]
+        width, height = self.bounds
+        gone = active & ((x < -length) | (x > width + length) |
+                         (y < -length) | (y > height + length))
+        if gone.any():
+            self.kill(np.flatnonzero(gone))
+        self.index_stale = True
+        self.sync_index()
+
+    def kill(self, slots):
+        slots = np.asarray(slots, dtype=np.intp)
+        slots = slots[self.active[slots]]
+        if slots.size == 0:
+            return
+        self._unshare()
+        self.active[slots] = False
+        self.speed[slots] = 0.0
+        self.live -= slots.size
+        if self.owner_live is not None:
+            np.subtract.at(self.owner_live, self.owner[slots], 1)
+        self.free.extend(slots.tolist())
+        self.index_stale = True
+        self.compact()
+
+    def compact(self):
+        """Trim trailing dead slots and drop them from the free list."""
+        n = self.count
+        if n == 0 or self.active[n - 1]:
+            return
+        alive = np.flatnonzero(self.active[:n])
+        self.count = int(alive[-1]) + 1 if alive.size else 0
+        if self.count == 0:
+            self.free.clear()
+        else:
+            self.free = [slot for slot in self.free if slot < self.count]
+
+    def clear(self):
+        self._unshare()
+        self.active[:self.count] = False
+        self.speed[:self.count] = 0.0
+        self.count = 0
+        self.live = 0
+        self.free.clear()
+        if self.owner_live is not None:
+            self.owner_live[:] = 0
+        if self.index is not None:
+            self.index.clear()
+            self.index_stale = False
+
+    _FIELDS = ("x", "y", "angle", "speed", "width", "length", "color", "active", "cos", "sin",
+               "prev_x", "prev_y", "owner")
+
+    def snapshot(self):
+        """Capture the pool in O(1); see ``restore``.
+
+        The snapshot shares the pool's arrays and free list, and whichever
+        side writes next copies them first, so taking a checkpoint every
+        frame costs no more than the one copy the next update needs anyway.
+        """
+        self._shared = True
+        state = {name: getattr(self, name) for name in self._FIELDS}
+        state.update(count=self.count, live=self.live, spawned=self.spawned,
+                     free=self.free, palette=list(self.palette))
+        if self.owner_live is not None:
+            state["owner_live"] = self.owner_live.copy()
+        return state
+
+    def restore(self, state):
+        """Return to a ``snapshot``, sharing its arrays until the next write.
+
+        States from ``simulation.unpack_state`` hold only the first
+        ``count`` slots; those are copied into the pool's own arrays.
+        """
+        n = state["count"]
+        if state["x"].size == n:
+            self._unshare()
+            if n > self.capacity:
+                capacity = self.capacity
+                while n > capacity:
+                    capacity *= 2
+                self._allocate(capacity)
+            old = self.count
+            for name in self._FIELDS:
+                getattr(self, name)[:n] = state[name]
+            if old > n:
+                self.active[n:old] = False
+                self.speed[n:old] = 0.0
+            self.free = list(state["free"])
+        else:
+            for name in self._FIELDS:
+                setattr(self, name, state[name])
+            self.capacity = state["x"].size
+            self.free = state["free"]
+            self._shared = True
+        self.count = n
+        self.live = state["live"]
+        self.spawned = state["spawned"]
+        # Palettes only ever grow, so keep whichever is longer; ids cached by
+        # patterns against this pool then stay valid in both directions
+        if len(state["palette"]) > len(self.palette):
+            self.palette = list(state["palette"])
+            self._color_index = {color: i for i, color in enumerate(self.palette)}
+        if self.owner_live is not None:
+            if "owner_live" in state:
+                self.owner_live = state["owner_live"].copy()
+            else:
+                self.track_owners(self.owner_live.size)
+        self.index_stale = True
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self._FIELDS)
+
+    def active_slots(self):
+        return np.flatnonzero(self.active[:self.count])
+
+    def __len__(self):
+        return self.live
+
+    def __iter__(self):
+        """Yield each live laser as a ``Laser`` object (slow path)."""
+        from game_patterns import Laser
+        palette = self.palette
+        for i in self.active_slots().tolist():
+            yield Laser(self.x[i], self.y[i], self.angle[i], self.speed[i],
+                        palette[self.color[i]], int(self.width[i]), self.length[i])
@@ -0,0 +1,27 @@
+class Level:
+    def __init__(self, pattern_func):
+        self.pattern_func = pattern_func
+        self.lasers = []
+        self.frame = 0
+
+    def update(self, player):
+        self.frame += 1
+        # Generate new lasers according to the pattern
+        new_lasers = self.pattern_func(self.frame)
+        if new_lasers:
+            self.lasers.extend(new_lasers)
+        # Update lasers, compacting in place and recycling the dead ones
+        lasers = self.lasers
+        keep = 0
+        for laser in lasers:
+            laser.update()
+            if laser.active:
+                lasers[keep] = laser
+                keep += 1
+            else:
+                laser.release()
+        del lasers[keep:]
+
+    def draw(self, surface):
+        for laser in self.lasers:
+            laser.draw(surface)
@@ -5,217 +5,88 @@ import math
 import random
 import time
 import json
-from settings import load_settings, save_settings
-from game_patterns import LEVEL_PATTERNS, PatternSwitcher
+from settings import SettingsStore, RENDER_RATES
+from pattern_scripts import default_level
+from simulation import Simulation
+from input_mapper import InputMapper
+from renderer import LaserRenderer, LayeredScreen
+from text_cache import render_text
+from profiler import FrameProfiler, NULL_PROFILER
+from replay import ReplayRecorder, pattern_source
+from assets import assets, play_music
+from ui import Button, Slider, fonts, WHITE, GRAY, DARK_GRAY, BLUE, GREEN, RED
+from level import Level
 
-# Initialize Pygame
-pygame.init()
-
-# Set up display
 WIDTH, HEIGHT = 1280, 800
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("My 2D Game")
 
-# Set up clock for FPS
+# Set up clock for FPS. Gameplay always advances in fixed 1/FPS ticks;
+# rendering runs at the render_rate setting and interpolates between ticks
 clock = pygame.time.Clock()
 FPS = 60
+TICK = 1 / FPS
+# Ticks allowed per rendered frame; beyond this the game slows down rather
+# than spending every frame catching up
+MAX_STEPS = 8
+
+# The window, mixer, fonts and level patterns are created by init(), so
+# importing this module has no side effects
+screen = None
+font = small_font = None
+level_patterns = level_source = None
+settings_store = None
 
-# Colors
-WHITE = (255, 255, 255)
-GRAY = (100, 100, 100)
-DARK_GRAY = (50, 50, 50)
-BLUE = (0, 120, 215)
-GREEN = (0, 200, 0)
-RED = (200, 0, 0)
+# Frame profiler traces are written next to the game as .csv and .json
+PROFILE_TRACE = "frame_trace"
 
-# Fonts
-font = pygame.font.SysFont(None, 48)
-small_font = pygame.font.SysFont(None, 32)
+# Key bindings are resolved once here and recompiled only on rebinds
+input_mapper = InputMapper()
+
+# Laser sprites are cached across runs, so one renderer serves every game
+laser_renderer = LaserRenderer()
 
-# Load menu music
 ASSET_PATH = os.path.join(os.path.dirname(__file__), "assets")
 MENU_MUSIC_PATH = os.path.join(ASSET_PATH, "Bocchi the Rock! - Guitar, Loneliness and Blue Planet [instrumental] (ギターと孤独と蒼い惑星, 기타와 고독과 푸른 행성).mp3")  # Change filename as needed
 
-if os.path.exists(MENU_MUSIC_PATH):
-    pygame.mixer.music.load(MENU_MUSIC_PATH)
-else:
-    print("Menu music not found at:", MENU_MUSIC_PATH)
-
-# Button class
-class Button:
-    def __init__(self, text, x, y, w, h):
-        self.text = text
-        self.rect = pygame.Rect(x, y, w, h)
-        self.color = GRAY
-        self.hover_color = BLUE
-        self.current_color = self.color
-
-    def draw(self, surface):
-        pygame.draw.rect(surface, self.current_color, self.rect, border_radius=8)
-        text_surf = font.render(self.text, True, WHITE)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        surface.blit(text_surf, text_rect)
-
-    def is_hovered(self, mouse_pos):
-        return self.rect.collidepoint(mouse_pos)
-
-    def update(self, mouse_pos):
-        self.current_color = self.hover_color if self.is_hovered(mouse_pos) else self.color
-
-# Slider class for volume
-class Slider:
-    def __init__(self, x, y, w, h, min_val, max_val, start_val):
-        self.rect = pygame.Rect(x, y, w, h)
-        self.min_val = min_val
-        self.max_val = max_val
-        self.value = start_val
-        self.handle_rect = pygame.Rect(x + int((start_val - min_val) / (max_val - min_val) * w) - 10, y - 5, 20, h + 10)
-        self.dragging = False
-
-    def draw(self, surface):
-        pygame.draw.rect(surface, WHITE, self.rect, 2)
-        pygame.draw.rect(surface, GREEN if self.dragging else GRAY, self.handle_rect)
-        value_text = small_font.render(f"{int(self.value * 100)}%", True, WHITE)
-        surface.blit(value_text, (self.rect.right + 20, self.rect.centery - value_text.get_height() // 2))
-
-    def handle_event(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if self.handle_rect.collidepoint(event.pos):
-                self.dragging = True
-        elif event.type == pygame.MOUSEBUTTONUP:
-            self.dragging = False
-        elif event.type == pygame.MOUSEMOTION and self.dragging:
-            x = max(self.rect.left, min(event.pos[0], self.rect.right))
-            self.handle_rect.x = x - self.handle_rect.width // 2
-            rel_x = x - self.rect.left
-            self.value = self.min_val + (rel_x / self.rect.width) * (self.max_val - self.min_val)
-
-    def get_value(self):
-        return self.value
-
-def get_key_state(settings):
-    """Return a dict mapping action names to whether their key is pressed."""
-    pressed = pygame.key.get_pressed()
-    keymap = {}
-    for action, keyname in settings["key_bindings"].items():
-        try:
-            key_const = getattr(pygame, f'K_{keyname.lower()}')
-        except AttributeError:
-            # fallback for special keys
-            key_const = pygame.key.key_code(keyname)
-        keymap[action] = pressed[key_const]
-    return keymap
-
-# Player class for bullet hell movement
-class Player:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.radius = 16
-        self.color = BLUE
-        self.speed = 5
-        self.dash_distance = 80
-        self.dash_cooldown = 60
-        self.dash_timer = 0
-        self.hitbox_radius = 4
-        self.alive = True
-
-    def handle_input(self, keymap):
-        if not self.alive:
-            return
-        dx, dy = 0, 0
-        if keymap.get("move_left"):
-            dx -= 1
-        if keymap.get("move_right"):
-            dx += 1
-        if keymap.get("move_up"):
-            dy -= 1
-        if keymap.get("move_down"):
-            dy += 1
-        if dx != 0 and dy != 0:
-            dx *= 0.7071
-            dy *= 0.7071
-        self.x += dx * self.speed
-        self.y += dy * self.speed
-        self.x = max(self.radius, min(WIDTH - self.radius, self.x))
-        self.y = max(self.radius, min(HEIGHT - self.radius, self.y))
-
-    def dash(self, keymap):
-        if self.dash_timer == 0 and self.alive:
-            dx, dy = 0, 0
-            if keymap.get("move_left"):
-                dx -= 1
-            if keymap.get("move_right"):
-                dx += 1
-            if keymap.get("move_up"):
-                dy -= 1
-            if keymap.get("move_down"):
-                dy += 1
-            if dx == 0 and dy == 0:
-                dy = -1
-            if dx != 0 and dy != 0:
-                dx *= 0.7071
-                dy *= 0.7071
-            self.x += dx * self.dash_distance
-            self.y += dy * self.dash_distance
-            self.x = max(self.radius, min(WIDTH - self.radius, self.x))
-            self.y = max(self.radius, min(HEIGHT - self.radius, self.y))
-            self.dash_timer = self.dash_cooldown
-
-    def update_dash_timer(self):
-        if self.dash_timer > 0:
-            self.dash_timer -= 1
-
-    def draw(self, surface):
-        pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(surface, WHITE, (int(self.x), int(self.y)), self.hitbox_radius)
-        if self.dash_timer > 0 and self.alive:
-            cooldown_text = small_font.render(f"Dash CD: {self.dash_timer//FPS + 1}s", True, RED)
-            surface.blit(cooldown_text, (10, 10))
-
-    def is_hit(self, lasers):
-        if not self.alive:
-            return False
-        for laser in lasers:
-            # Distance from hitbox to laser line segment
-            lx, ly = laser.x, laser.y
-            ex = lx + math.cos(laser.angle) * laser.length
-            ey = ly + math.sin(laser.angle) * laser.length
-            px, py = self.x, self.y
-            # Closest point on the laser segment to the player
-            dx, dy = ex - lx, ey - ly
-            if dx == 0 and dy == 0:
-                dist = math.hypot(px - lx, py - ly)
-            else:
-                t = max(0, min(1, ((px - lx) * dx + (py - ly) * dy) / (dx * dx + dy * dy)))
-                closest_x = lx + t * dx
-                closest_y = ly + t * dy
-                dist = math.hypot(px - closest_x, py - closest_y)
-            if dist <= self.hitbox_radius + laser.width // 2:
-                return True
-        return False
-    
-class Level:
-    def __init__(self, pattern_func):
-        self.pattern_func = pattern_func
-        self.lasers = []
-        self.frame = 0
-
-    def update(self, player):
-        self.frame += 1
-        # Generate new lasers according to the pattern
-        new_lasers = self.pattern_func(self.frame)
-        if new_lasers:
-            self.lasers.extend(new_lasers)
-        # Update lasers
-        for laser in self.lasers:
-            laser.update()
-        # Remove inactive lasers
-        self.lasers = [l for l in self.lasers if l.active]
-
-    def draw(self, surface):
-        for laser in self.lasers:
-            laser.draw(surface)
+menu_music_loaded = False
+
+def on_setting_changed(key, value):
+    if key in ("key_bindings", "gamepad_bindings"):
+        input_mapper.sync(settings_store)
+
+def init():
+    """Open the window and mixer, load fonts and patterns, and start the music load."""
+    global screen, font, small_font, level_patterns, level_source, settings_store
+    if screen is not None:
+        return
+    # Settings live in memory from here on; changes are saved in the background
+    settings_store = SettingsStore()
+    settings_store.subscribe(on_setting_changed)
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("My 2D Game")
+
+    # Load menu music in the background; the menu starts without it
+    if os.path.exists(MENU_MUSIC_PATH):
+        assets.music(MENU_MUSIC_PATH)
+    else:
+        print("Menu music not found at:", MENU_MUSIC_PATH)
+    font, small_font = fonts()
+
+    # Level patterns come from the pattern script when present, compiled once
+    level_patterns, path = default_level(FPS)
+    level_source = pattern_source(path)
+
+def start_menu_music():
+    """Play the menu track once its bytes are in; never waits for the load."""
+    global menu_music_loaded
+    if menu_music_loaded:
+        pygame.mixer.music.play(-1)
+        return
+    data = assets.get(("music", MENU_MUSIC_PATH))
+    if data is not None:
+        play_music(data, MENU_MUSIC_PATH)
+        menu_music_loaded = True
+
 # Main menu state
 MENU = "menu"
 GAME = "game"
@@ -239,29 +110,28 @@ slider_y = HEIGHT // 2 - 40
 volume_slider = Slider(slider_x, slider_y, slider_width, slider_height, 0.0, 1.0, 0.5)
 
 binds_button = Button("Control Binds", slider_x, slider_y + 60, slider_width, 40)
+render_rate_button = Button("Render: 60 Hz", slider_x, slider_y + 120, slider_width, 40)
 
 def draw_menu():
     screen.fill(DARK_GRAY)
-    mouse_pos = pygame.mouse.get_pos()
-    start_button.update(mouse_pos)
-    settings_button.update(mouse_pos)
     start_button.draw(screen)
     settings_button.draw(screen)
 
 def draw_settings():
     screen.fill((30, 30, 30))
-    settings_text = font.render("Settings", True, WHITE)
+    settings_text = render_text(font, "Settings", WHITE)
     screen.blit(settings_text, (WIDTH // 2 - settings_text.get_width() // 2, 80))
-    volume_text = small_font.render("General Volume", True, WHITE)
+    volume_text = render_text(small_font, "General Volume", WHITE)
     screen.blit(volume_text, (slider_x, slider_y - 30))
     volume_slider.draw(screen)
     binds_button.draw(screen)
-    esc_text = small_font.render("Press ESC to return", True, WHITE)
+    render_rate_button.draw(screen)
+    esc_text = render_text(small_font, "Press ESC to return", WHITE)
     screen.blit(esc_text, (WIDTH // 2 - esc_text.get_width() // 2, HEIGHT - 60))
 
 def draw_button_binds(settings, selected_action):
     screen.fill((20, 20, 40))
-    title = font.render("Control Binds", True, WHITE)
+    title = render_text(font, "Control Binds", WHITE)
     screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 60))
     y = 160
     x = WIDTH // 2 - 200
@@ -271,15 +141,26 @@ def draw_button_binds(settings, selected_action):
             color = BLUE
         else:
             color = WHITE
-        action_text = small_font.render(f"{action_name}:", True, color)
-        key_text = small_font.render(f"{key.upper()}", True, color)
+        action_text = render_text(small_font, f"{action_name}:", color)
+        key_text = render_text(small_font, f"{key.upper()}", color)
         screen.blit(action_text, (x, y))
         pygame.draw.rect(screen, color, (x + 220, y, 120, 36), 2 if selected_action == action else 1)
         screen.blit(key_text, (x + 230, y))
         y += 60
-    esc_text = small_font.render("Press ESC to return", True, WHITE)
+    esc_text = render_text(small_font, "Press ESC to return", WHITE)
     screen.blit(esc_text, (WIDTH // 2 - esc_text.get_width() // 2, HEIGHT - 60))
 
+def death_overlay():
+    """Translucent full-screen fade for the death screen, built once."""
+    global _death_overlay
+    if _death_overlay is None:
+        _death_overlay = pygame.Surface((WIDTH, HEIGHT))
+        _death_overlay.set_alpha(180)
+        _death_overlay.fill((0, 0, 0))
+    return _death_overlay
+
+_death_overlay = None
+
 def button_binds_menu(settings):
     running = True
     selected_action = None
@@ -292,9 +173,16 @@ def button_binds_menu(settings):
         action_rects.append((action, rect))
         y += 60
 
+    # Only redraw after input; the screen is static otherwise, and after the
+    # first frame only the binding rows can change
+    dirty = True
+    drawn = False
+    rows_rect = pygame.Rect(x, 160, 360, 60 * len(actions))
     while running:
         clock.tick(FPS)
         for event in pygame.event.get():
+            if event.type != pygame.MOUSEMOTION:
+                dirty = True
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -311,21 +199,40 @@ def button_binds_menu(settings):
                 if event.type == pygame.KEYDOWN:
                     # Update the key binding
                     key_name = pygame.key.name(event.key)
-                    settings["key_bindings"][selected_action] = key_name
-                    from settings import save_settings
-                    save_settings(settings)
+                    settings.set_binding(selected_action, key_name)
                     selected_action = None
 
-        draw_button_binds(settings, selected_action)
-        pygame.display.flip()
+        if dirty:
+            draw_button_binds(settings, selected_action)
+            if drawn:
+                pygame.display.update(rows_rect)
+            else:
+                pygame.display.flip()
+                drawn = True
+            dirty = False
 
 def bullet_hell_game():
     if pygame.mixer.music.get_busy():
         pygame.mixer.music.stop()
-    settings = load_settings()
-    player = Player(WIDTH // 2, HEIGHT // 2)
+    settings = settings_store
+    settings.reload_if_changed()
+    sim = Simulation(patterns=level_patterns, fps=FPS)
+    player = sim.player
+    profiler = FrameProfiler() if settings.get("profiler") else NULL_PROFILER
+    sim.profiler = profiler
+    # Optional input recording, saved once when the run ends
+    recorder = ReplayRecorder(sim.seed, FPS, level_source) if settings.get("record_replays") else None
+    # Retry restores this; F5 moves it to the current frame for practice
+    checkpoint = sim.snapshot()
+    input_mapper.sync(settings)
+    input_mapper.reset()
+    render_rate = settings.get("render_rate", FPS)
+    accumulator = 0.0
+    last_time = time.perf_counter()
+    # Only the regions lasers, the player and the HUD touch are repainted
+    layers = LayeredScreen(screen, (0, 0, 0))
     level_index = 0
-    level = Level(LEVEL_PATTERNS[level_index])
+    level = Level(level_patterns[level_index])
     running = True
     death = False
     death_time = 0
@@ -335,97 +242,124 @@ def bullet_hell_game():
     retry_btn = Button("Retry", WIDTH // 2 - btn_width // 2, HEIGHT // 2 + 40, btn_width, btn_height)
     quit_btn = Button("Quit to Menu", WIDTH // 2 - btn_width // 2, HEIGHT // 2 + 120, btn_width, btn_height)
 
-    # Pattern switcher for dynamic laser patterns
-    pattern_switcher = PatternSwitcher(LEVEL_PATTERNS, fps=FPS)
-    lasers = []
-
     while running:
-        clock.tick(FPS)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if not death and not show_death_screen:
-                if event.type == pygame.KEYDOWN:
-                    # Use the dash key from settings
-                    dash_key = settings["key_bindings"].get("dash", "space")
-                    try:
-                        dash_key_const = getattr(pygame, f'K_{dash_key.lower()}')
-                    except AttributeError:
-                        dash_key_const = pygame.key.key_code(dash_key)
-                    if event.key == pygame.K_ESCAPE:
-                        running = False
-                    if event.key == dash_key_const:
-                        keymap = get_key_state(settings)
-                        player.dash(keymap)
-                    if event.key == pygame.K_TAB:
-                        level_index = (level_index + 1) % len(LEVEL_PATTERNS)
-                        level = Level(LEVEL_PATTERNS[level_index])
-            elif show_death_screen:
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    mouse_pos = pygame.mouse.get_pos()
-                    retry_btn.update(mouse_pos)
-                    quit_btn.update(mouse_pos)
-                    if retry_btn.is_hovered(mouse_pos):
-                        return bullet_hell_game()
-                    elif quit_btn.is_hovered(mouse_pos):
-                        return
+        clock.tick(render_rate)
+        profiler.begin_frame()
+        with profiler.phase("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    if recorder and not death:
+                        recorder.save()
+                    pygame.quit()
+                    sys.exit()
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    # Opt-in frame profiler; F3 toggles the overlay, F4 exports traces
+                    if profiler is NULL_PROFILER:
+                        profiler = sim.profiler = FrameProfiler()
+                    profiler.overlay_visible = not profiler.overlay_visible
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F4 and profiler is not NULL_PROFILER:
+                    profiler.export_csv(PROFILE_TRACE + ".csv")
+                    profiler.export_json(PROFILE_TRACE + ".json")
+                if not death and not show_death_screen:
+                    # Dash key/button presses are latched until the next poll
+                    input_mapper.handle_event(event)
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            running = False
+                        if event.key == pygame.K_F5:
+                            checkpoint = sim.snapshot()
+                        if event.key == pygame.K_TAB:
+                            level_index = (level_index + 1) % len(level_patterns)
+                            level = Level(level_patterns[level_index])
+                elif show_death_screen:
+                    if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                        mouse_pos = pygame.mouse.get_pos()
+                        retry_btn.update(mouse_pos)
+                        quit_btn.update(mouse_pos)
+                        if retry_btn.is_hovered(mouse_pos):
+                            sim.restore(checkpoint)
+                            if recorder:
+                                # The run is deterministic, so the inputs up to
+                                # the checkpoint still replay into it
+                                del recorder.inputs[sim.frame:]
+                            input_mapper.reset()
+                            layers.invalidate()
+                            death = show_death_screen = False
+                            accumulator = 0.0
+                            last_time = time.perf_counter()
+                            break
+                        elif quit_btn.is_hovered(mouse_pos):
+                            return
 
+        now = time.perf_counter()
+        accumulator += now - last_time
+        last_time = now
         if not death and not show_death_screen:
-            keymap = get_key_state(settings)
-            player.handle_input(keymap)
-            player.update_dash_timer()
-            # Update lasers using the pattern switcher
-            pattern_func, pattern_frame = pattern_switcher.get_current_pattern()
-            new_lasers = pattern_func(pattern_frame)
-            if new_lasers:
-                lasers.extend(new_lasers)
-            for laser in lasers:
-                laser.update()
-            # Check for player collisions with lasers
-            if player.is_hit(lasers):
-                player.alive = False
-                death = True
-                death_time = pygame.time.get_ticks()
+            steps = 0
+            while accumulator >= TICK and steps < MAX_STEPS and not death:
+                with profiler.phase("input"):
+                    inputs = input_mapper.poll()
+                if recorder:
+                    recorder.record(inputs)
+                # Player movement, pattern spawns, laser updates and collision
+                if not sim.step(inputs):
+                    death = True
+                    death_time = pygame.time.get_ticks()
+                    if recorder:
+                        recorder.save()
+                accumulator -= TICK
+                steps += 1
+            if steps == MAX_STEPS:
+                accumulator %= TICK
         elif death and not show_death_screen:
             if pygame.time.get_ticks() - death_time > 1000:
                 show_death_screen = True
 
-        screen.fill((0, 0, 0))
-        # Draw lasers and player
-        for laser in lasers:
-            laser.draw(screen)
-        player.draw(screen)
+        with profiler.phase("draw"):
+            layers.begin_frame()
+            # Draw lasers and player part way between the last two ticks
+            alpha = 1.0 if death else accumulator / TICK
+            layers.add_many(laser_renderer.draw(screen, sim.lasers, alpha))
+            layers.add_many(player.draw(screen, small_font, FPS, alpha))
 
-        if not death and not show_death_screen:
-            info_text = small_font.render(
-                "Move: Your binds | Dash: Your bind | Next Pattern: TAB | ESC: Menu", True, WHITE)
-            screen.blit(info_text, (WIDTH // 2 - info_text.get_width() // 2, HEIGHT - 40))
-            level_text = small_font.render(f"Pattern {level_index + 1}/{len(LEVEL_PATTERNS)}", True, WHITE)
-            screen.blit(level_text, (10, HEIGHT - 40))
-        elif show_death_screen:
-            overlay = pygame.Surface((WIDTH, HEIGHT))
-            overlay.set_alpha(180)
-            overlay.fill((0, 0, 0))
-            screen.blit(overlay, (0, 0))
-            death_text = font.render("You Died!", True, RED)
-            screen.blit(death_text, (WIDTH // 2 - death_text.get_width() // 2, HEIGHT // 2 - 80))
-            retry_btn.update(pygame.mouse.get_pos())
-            quit_btn.update(pygame.mouse.get_pos())
-            retry_btn.draw(screen)
-            quit_btn.draw(screen)
-
-        pygame.display.flip()
+            if not death and not show_death_screen:
+                info = "Move: Your binds | Dash: Your bind | Next Pattern: TAB | Checkpoint: F5 | ESC: Menu"
+                info_text = render_text(small_font, info, WHITE)
+                layers.add(screen.blit(info_text, (WIDTH // 2 - info_text.get_width() // 2, HEIGHT - 40)), info)
+                level_label = f"Pattern {level_index + 1}/{len(level_patterns)}"
+                level_text = render_text(small_font, level_label, WHITE)
+                layers.add(screen.blit(level_text, (10, HEIGHT - 40)), level_label)
+            elif show_death_screen:
+                layers.invalidate()
+                screen.blit(death_overlay(), (0, 0))
+                death_text = render_text(font, "You Died!", RED)
+                screen.blit(death_text, (WIDTH // 2 - death_text.get_width() // 2, HEIGHT // 2 - 80))
+                retry_btn.update(pygame.mouse.get_pos())
+                quit_btn.update(pygame.mouse.get_pos())
+                retry_btn.draw(screen)
+                quit_btn.draw(screen)
+            layers.add_many(profiler.draw_overlay(screen, small_font))
+
+        with profiler.phase("flip"):
+            layers.present()
+        profiler.end_frame(sim.lasers)
+
+    if recorder and not death:
+        recorder.save()
 
 def main():
     global state
-    # Load settings at start
-    from settings import load_settings, save_settings
-    settings = load_settings()
+    init()
+    settings = settings_store
+    render_rate_button.text = f"Render: {settings['render_rate']} Hz"
     running = True
+    # Menus are static between inputs, so only redraw when something changed
+    dirty = True
     while running:
         clock.tick(FPS)
         for event in pygame.event.get():
+            if event.type != pygame.MOUSEMOTION or volume_slider.dragging:
+                dirty = True
             if event.type == pygame.QUIT:
                 running = False
 
@@ -433,10 +367,9 @@ def main():
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     if start_button.is_hovered(pygame.mouse.get_pos()):
                         bullet_hell_game()
-                        if os.path.exists(MENU_MUSIC_PATH):
-                            pygame.mixer.music.load(MENU_MUSIC_PATH)
-                            pygame.mixer.music.play(-1)
-                            pygame.mixer.music.set_volume(volume_slider.get_value())
+                        # The track stays loaded in the mixer, so just restart it
+                        start_menu_music()
+                        pygame.mixer.music.set_volume(volume_slider.get_value())
                         state = MENU
                     elif settings_button.is_hovered(pygame.mouse.get_pos()):
                         state = SETTINGS
@@ -447,21 +380,41 @@ def main():
                     if binds_button.is_hovered(pygame.mouse.get_pos()):
                         # Open button binds menu
                         button_binds_menu(settings)
+                    elif render_rate_button.is_hovered(pygame.mouse.get_pos()):
+                        rate = settings["render_rate"]
+                        rates = RENDER_RATES
+                        settings.set("render_rate", rates[(rates.index(rate) + 1) % len(rates)] if rate in rates else FPS)
+                        render_rate_button.text = f"Render: {settings['render_rate']} Hz"
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                     state = MENU
 
         # Play menu music in both MENU and SETTINGS
         if state in (MENU, SETTINGS):
-            if not pygame.mixer.music.get_busy() and os.path.exists(MENU_MUSIC_PATH):
-                pygame.mixer.music.play(-1)
+            if not pygame.mixer.music.get_busy():
+                start_menu_music()
             pygame.mixer.music.set_volume(volume_slider.get_value())
-            if state == MENU:
-                draw_menu()
-            else:
-                draw_settings()
-
-        pygame.display.flip()
-
+            mouse_pos = pygame.mouse.get_pos()
+            buttons = (start_button, settings_button) if state == MENU else (binds_button, render_rate_button)
+            hovered = [button for button in buttons if button.update(mouse_pos)]
+            if dirty:
+                if state == MENU:
+                    draw_menu()
+                else:
+                    draw_settings()
+                pygame.display.flip()
+                dirty = False
+            elif hovered:
+                # A hover change only touches its own button
+                background = DARK_GRAY if state == MENU else (30, 30, 30)
+                for button in hovered:
+                    screen.fill(background, button.rect)
+                    button.draw(screen)
+                pygame.display.update([button.rect for button in hovered])
+
+    if settings.get("profiler"):
+        print("\n".join(assets.report()))
+    assets.shutdown()
+    settings.flush()
     pygame.quit()
     sys.exit()
     
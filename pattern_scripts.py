@@ -0,0 +1,268 @@
+"""Declarative laser patterns compiled ahead of time into spawn timelines.
+
+A pattern file (JSON, or TOML on Python 3.11+) holds a list of patterns,
+each with a duration in seconds and one or more emitters::
+
+    {"patterns": [
+        {"name": "simple_radial", "duration": 8, "emitters": [
+            {"origin": [400, 100], "count": 8, "spread": 360,
+             "speed": 6, "period": 1.0, "phase": 1.0, "color": "red"}
+        ]}
+    ]}
+
+Emitter keys (angles in degrees, times in seconds):
+
+    origin         [x, y] spawn point
+    origin_spread  [sx, sy], each shot is offset uniformly in [-s, s]
+    count          lasers per shot
+    angle          base direction (0 = right, 90 = down)
+    spread         arc the shot's lasers are fanned across (360 = full ring)
+    random_angle   true to pick each laser's angle at random within the arc
+    spin           degrees per second added to the base direction
+    sweep          amplitude of a sinusoidal wobble of the base direction
+    sweep_rate     wobble speed in radians per second
+    period         time between shots
+    phase          time of the first shot
+    speed, width, length, color
+
+Compilation turns every shot in the pattern's duration into flat arrays
+sorted by frame plus a per-frame offset table, so ``emit`` is two index
+lookups and at most one bulk ``LaserPool.spawn_many`` call. The random
+parts (``random_angle`` and ``origin_spread``) are stored as ranges and
+drawn from the simulation's RNG as each frame is emitted, so every run
+and every lap differs and a seed still reproduces a run.
+"""
+import json
+import math
+import os
+import weakref
+
+import numpy as np
+
+from game_patterns import RED, BLUE, GREEN
+
+COLORS = {"red": RED, "blue": BLUE, "green": GREEN}
+
+PATTERN_DIR = os.path.join(os.path.dirname(__file__), "patterns")
+LEVEL_SCRIPT = os.path.join(PATTERN_DIR, "level_patterns.json")
+
+
+class PatternScriptError(ValueError):
+    pass
+
+
+class CompiledPattern:
+    """A pattern as a precomputed spawn timeline, driven by PatternSwitcher."""
+
+    def __init__(self, name, duration, frames, x, y, angle, speed, width, length,
+                 color_index, palette, fps, jitter=None):
+        self.__name__ = name
+        self.name = name
+        self.duration = duration
+        self.fps = fps
+        order = np.argsort(frames, kind="stable")
+        self.x = x[order]
+        self.y = y[order]
+        self.angle = angle[order]
+        self.speed = speed[order]
+        self.width = width[order]
+        self.length = length[order]
+        self.color_index = color_index[order]
+        self.palette = palette
+        # Per laser half-ranges of the random angle and origin offsets, and
+        # where each shot starts, since one shot shares one origin draw
+        jitter = jitter or {}
+        zeros = np.zeros(x.size)
+        self.jitter_angle = jitter.get("angle", zeros)[order]
+        self.jitter_x = jitter.get("x", zeros)[order]
+        self.jitter_y = jitter.get("y", zeros)[order]
+        self.shot_start = jitter.get("shot_start", np.ones(x.size, dtype=bool))[order]
+        self.random = bool(self.jitter_angle.any() or self.jitter_x.any() or self.jitter_y.any())
+        # offsets[f]:offsets[f + 1] are the lasers spawned on frame f
+        total_frames = int(round(duration * fps))
+        self.offsets = np.searchsorted(frames[order], np.arange(total_frames + 2), side="left")
+        # Palette ids per pool; weak so a new pool reusing an old id() misses
+        self._pool_colors = weakref.WeakKeyDictionary()
+
+    def __len__(self):
+        return self.x.size
+
+    def emit(self, pool, frame, rng=None):
+        if frame + 1 >= self.offsets.size:
+            return
+        lo = self.offsets[frame]
+        hi = self.offsets[frame + 1]
+        if lo == hi:
+            return
+        colors = self._pool_colors.get(pool)
+        if colors is None:
+            colors = np.array([pool.color_id(c) for c in self.palette], dtype=np.int16)
+            self._pool_colors[pool] = colors
+        x, y, angle = self.x[lo:hi], self.y[lo:hi], self.angle[lo:hi]
+        if self.random and rng is not None:
+            x, y, angle = self._jitter(lo, hi, x, y, angle, rng)
+        pool.spawn_many(x, y, angle, self.speed[lo:hi], colors[self.color_index[lo:hi]],
+                        self.width[lo:hi], self.length[lo:hi])
+
+    def _jitter(self, lo, hi, x, y, angle, rng):
+        # Draw from the simulation's RNG so runs stay reproducible from its seed
+        gen = np.random.default_rng(rng.getrandbits(64))
+        angle = angle + gen.uniform(-1.0, 1.0, hi - lo) * self.jitter_angle[lo:hi]
+        jx, jy = self.jitter_x[lo:hi], self.jitter_y[lo:hi]
+        if jx.any() or jy.any():
+            starts = np.flatnonzero(self.shot_start[lo:hi])
+            sizes = np.diff(np.append(starts, hi - lo))
+            x = x + np.repeat(gen.uniform(-1.0, 1.0, starts.size), sizes) * jx
+            y = y + np.repeat(gen.uniform(-1.0, 1.0, starts.size), sizes) * jy
+        return x, y, angle
+
+
+def _color(value):
+    if isinstance(value, str):
+        try:
+            return COLORS[value.lower()]
+        except KeyError:
+            raise PatternScriptError(f"unknown color {value!r}") from None
+    return tuple(int(c) for c in value)
+
+
+_NUMBER_KEYS = ("angle", "spread", "spin", "sweep", "sweep_rate", "period", "phase",
+                "speed", "width", "length")
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_emitter(spec, name, index):
+    """Raise PatternScriptError for an emitter ``_compile_emitter`` can't compile."""
+    where = f"pattern {name!r} emitter {index}"
+    if not isinstance(spec, dict):
+        raise PatternScriptError(f"{where} should be a mapping, got {spec!r}")
+    count = spec.get("count", 1)
+    if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+        raise PatternScriptError(f"{where}: count should be an integer of at least 1, got {count!r}")
+    for key in ("origin", "origin_spread"):
+        value = spec.get(key, (0, 0))
+        if not (isinstance(value, (list, tuple)) and len(value) == 2
+                and all(_is_number(v) for v in value)):
+            raise PatternScriptError(f"{where}: {key} should be [x, y] numbers, got {value!r}")
+    for key in _NUMBER_KEYS:
+        if key in spec and not _is_number(spec[key]):
+            raise PatternScriptError(f"{where}: {key} should be a number, got {spec[key]!r}")
+
+
+def _compile_emitter(spec, duration, fps):
+    # Shots land on whole frames; PatternSwitcher counts pattern frames from 1
+    period = max(1, int(round(float(spec.get("period", 1.0)) * fps)))
+    phase = max(1, int(round(float(spec.get("phase", period / fps)) * fps)))
+    shot_frames = np.arange(phase, int(round(duration * fps)) + 1, period, dtype=np.int64)
+    times = shot_frames / fps
+    shots = times.size
+    count = int(spec.get("count", 1))
+
+    base = math.radians(spec.get("angle", 0.0))
+    base = base + math.radians(spec.get("spin", 0.0)) * times
+    base = base + math.radians(spec.get("sweep", 0.0)) * np.sin(spec.get("sweep_rate", 1.0) * times)
+    spread = math.radians(spec.get("spread", 0.0))
+    randomized = spec.get("random_angle", False)
+    if randomized:
+        # Centred on the base direction; emit adds a random offset within the arc
+        offsets = np.zeros((shots, count))
+    elif count > 1:
+        # A full ring has no duplicate at the far end; a partial fan includes both edges
+        full = abs(spread - 2 * math.pi) < 1e-9
+        fan = np.linspace(0, spread, count, endpoint=not full) - (0 if full else spread / 2)
+        offsets = np.broadcast_to(fan, (shots, count))
+    else:
+        offsets = np.zeros((shots, count))
+    angle = (base[:, None] + offsets).ravel()
+
+    ox, oy = spec.get("origin", (0, 0))
+    sx, sy = spec.get("origin_spread", (0, 0))
+    n = angle.size
+    shot_start = np.zeros((shots, count), dtype=bool)
+    shot_start[:, 0] = True
+    return {
+        "frames": np.repeat(shot_frames, count),
+        "x": np.full(n, float(ox)),
+        "y": np.full(n, float(oy)),
+        "angle": angle,
+        "jitter_angle": np.full(n, spread / 2 if randomized else 0.0),
+        "jitter_x": np.full(n, float(abs(sx))),
+        "jitter_y": np.full(n, float(abs(sy))),
+        "shot_start": shot_start.ravel(),
+        "speed": np.full(n, float(spec.get("speed", 6))),
+        "width": np.full(n, int(spec.get("width", 4)), dtype=np.int32),
+        "length": np.full(n, float(spec.get("length", 32))),
+        "color": _color(spec.get("color", RED)),
+    }
+
+
+def compile_pattern(spec, fps=60):
+    """Compile one pattern mapping into a ``(CompiledPattern, duration)`` entry."""
+    try:
+        name = spec["name"]
+        duration = float(spec["duration"])
+        emitters = spec["emitters"]
+    except KeyError as e:
+        raise PatternScriptError(f"pattern is missing {e.args[0]!r}") from None
+    except (TypeError, ValueError):
+        raise PatternScriptError(f"pattern {spec.get('name')!r}: duration should be a number, "
+                                 f"got {spec['duration']!r}") from None
+    if not isinstance(emitters, list):
+        raise PatternScriptError(f"pattern {name!r}: emitters should be a list")
+    for i, emitter in enumerate(emitters):
+        _check_emitter(emitter, name, i)
+    parts = [_compile_emitter(e, duration, fps) for e in emitters]
+    palette = []
+    for part in parts:
+        if part["color"] not in palette:
+            palette.append(part["color"])
+    joined = {key: np.concatenate([p[key] for p in parts]) if parts else np.empty(0)
+              for key in ("frames", "x", "y", "angle", "speed", "width", "length",
+                          "jitter_angle", "jitter_x", "jitter_y")}
+    color_index = np.concatenate([np.full(p["x"].size, palette.index(p["color"]), dtype=np.int16)
+                                  for p in parts]) if parts else np.empty(0, dtype=np.int16)
+    pattern = CompiledPattern(name, duration, joined["frames"].astype(np.int64), joined["x"],
+                              joined["y"], joined["angle"], joined["speed"],
+                              joined["width"].astype(np.int32), joined["length"], color_index,
+                              palette, fps, jitter={
+                                  "angle": joined["jitter_angle"], "x": joined["jitter_x"],
+                                  "y": joined["jitter_y"],
+                                  "shot_start": np.concatenate([p["shot_start"] for p in parts])
+                                  if parts else np.empty(0, dtype=bool)})
+    return pattern, duration
+
+
+_default_levels = {}
+
+
+def default_level(fps=60):
+    """Return ``(patterns, path)`` for the level the game plays.
+
+    That is LEVEL_SCRIPT when it exists, compiled once per fps, and
+    otherwise the built-in LEVEL_PATTERNS with ``path`` None. Tools use
+    this too, so they measure the same level as live play.
+    """
+    level = _default_levels.get(fps)
+    if level is None:
+        if os.path.exists(LEVEL_SCRIPT):
+            level = (load_patterns(LEVEL_SCRIPT, fps), LEVEL_SCRIPT)
+        else:
+            from game_patterns import LEVEL_PATTERNS
+            level = (LEVEL_PATTERNS, None)
+        _default_levels[fps] = level
+    return level
+
+
+def load_patterns(path=LEVEL_SCRIPT, fps=60):
+    """Load a JSON or TOML pattern file as a list usable by PatternSwitcher."""
+    if path.endswith(".toml"):
+        import tomllib
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, "r") as f:
+            data = json.load(f)
+    return [compile_pattern(spec, fps) for spec in data.get("patterns", [])]
@@ -0,0 +1,96 @@
+from collision import first_swept_hit
+from text_cache import render_text
+
+# Playfield size the player is clamped to (matches the window in main.py)
+WIDTH, HEIGHT = 1280, 800
+# Simulation ticks per second; rendering may run at a different rate
+FPS = 60
+
+# Tuning in real units, converted to per-tick values below
+SPEED = 300             # pixels per second
+DASH_COOLDOWN = 1.0     # seconds
+
+WHITE = (255, 255, 255)
+BLUE = (0, 120, 215)
+RED = (200, 0, 0)
+
+# Player class for bullet hell movement
+class Player:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.prev_x = x     # position before the last tick, for interpolation
+        self.prev_y = y
+        self.radius = 16
+        self.color = BLUE
+        self.speed = SPEED / FPS
+        self.dash_distance = 80
+        self.dash_cooldown = round(DASH_COOLDOWN * FPS)
+        self.dash_timer = 0
+        self.hitbox_radius = 4
+        self.alive = True
+
+    def handle_input(self, keymap):
+        if not self.alive:
+            return
+        dx, dy = 0, 0
+        if keymap.get("move_left"):
+            dx -= 1
+        if keymap.get("move_right"):
+            dx += 1
+        if keymap.get("move_up"):
+            dy -= 1
+        if keymap.get("move_down"):
+            dy += 1
+        if dx != 0 and dy != 0:
+            dx *= 0.7071
+            dy *= 0.7071
+        self.x += dx * self.speed
+        self.y += dy * self.speed
+        self.x = max(self.radius, min(WIDTH - self.radius, self.x))
+        self.y = max(self.radius, min(HEIGHT - self.radius, self.y))
+
+    def dash(self, keymap):
+        if self.dash_timer == 0 and self.alive:
+            dx, dy = 0, 0
+            if keymap.get("move_left"):
+                dx -= 1
+            if keymap.get("move_right"):
+                dx += 1
+            if keymap.get("move_up"):
+                dy -= 1
+            if keymap.get("move_down"):
+                dy += 1
+            if dx == 0 and dy == 0:
+                dy = -1
+            if dx != 0 and dy != 0:
+                dx *= 0.7071
+                dy *= 0.7071
+            self.x += dx * self.dash_distance
+            self.y += dy * self.dash_distance
+            self.x = max(self.radius, min(WIDTH - self.radius, self.x))
+            self.y = max(self.radius, min(HEIGHT - self.radius, self.y))
+            self.dash_timer = self.dash_cooldown
+
+    def update_dash_timer(self):
+        if self.dash_timer > 0:
+            self.dash_timer -= 1
+
+    def draw(self, surface, font, fps=FPS, alpha=1.0):
+        import pygame
+        x = int(self.prev_x + (self.x - self.prev_x) * alpha)
+        y = int(self.prev_y + (self.y - self.prev_y) * alpha)
+        rects = [pygame.draw.circle(surface, self.color, (x, y), self.radius)]
+        pygame.draw.circle(surface, WHITE, (x, y), self.hitbox_radius)
+        if self.dash_timer > 0 and self.alive:
+            cooldown_text = render_text(font, f"Dash CD: {self.dash_timer//fps + 1}s", RED)
+            rects.append(surface.blit(cooldown_text, (10, 10)))
+        return rects
+
+    def is_hit(self, lasers):
+        if not self.alive:
+            return False
+        # Lasers live in a LaserPool, so the whole field is tested in one pass,
+        # over the whole move since the last tick so dashes can't tunnel
+        return first_swept_hit(lasers, self.prev_x, self.prev_y, self.x, self.y,
+                               self.hitbox_radius) >= 0
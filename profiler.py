@@ -0,0 +1,124 @@
+import csv
+import json
+import sys
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+PHASES = ("events", "input", "spawn", "update", "collision", "draw", "flip")
+COUNTERS = ("live_lasers", "dead_lasers", "allocations")
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.current[self.name] += time.perf_counter() - self.start
+
+
+class FrameProfiler:
+    """Times each phase of a frame and keeps a rolling window of samples.
+
+    Wrap each phase in ``with profiler.phase("update"):`` and bracket the
+    frame with ``begin_frame``/``end_frame``. Times are stored in
+    milliseconds. ``allocations`` is the change in live interpreter memory
+    blocks over the frame, a cheap stand-in for allocation pressure.
+    """
+
+    def __init__(self, history=600):
+        self.history = history
+        self.frames = deque(maxlen=history)
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.overlay_visible = False
+        self._phases = {name: _Phase(self, name) for name in PHASES}
+        self._frame_start = time.perf_counter()
+        self._blocks = sys.getallocatedblocks()
+        self.frame_index = 0
+
+    def phase(self, name):
+        return self._phases[name]
+
+    def begin_frame(self):
+        for name in PHASES:
+            self.current[name] = 0.0
+        self._blocks = sys.getallocatedblocks()
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self, lasers=None):
+        row = {name: seconds * 1e3 for name, seconds in self.current.items()}
+        row["frame"] = self.frame_index
+        row["total"] = (time.perf_counter() - self._frame_start) * 1e3
+        row["live_lasers"] = len(lasers) if lasers is not None else 0
+        row["dead_lasers"] = lasers.count - len(lasers) if lasers is not None else 0
+        row["allocations"] = sys.getallocatedblocks() - self._blocks
+        self.frames.append(row)
+        self.frame_index += 1
+
+    def percentiles(self, name, q=(50, 95, 99)):
+        if not self.frames:
+            return tuple(0.0 for _ in q)
+        values = np.fromiter((row[name] for row in self.frames), dtype=np.float64)
+        return tuple(np.percentile(values, q).tolist())
+
+    def summary(self):
+        return {name: self.percentiles(name) for name in ("total",) + PHASES}
+
+    def export_csv(self, path):
+        fields = ("frame", "total") + PHASES + COUNTERS
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(self.frames)
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"frames": list(self.frames), "summary": self.summary()}, f, indent=4)
+
+    def draw_overlay(self, surface, font, pos=(10, 40)):
+        if not self.overlay_visible:
+            return []
+        x, y = pos
+        lines = ["phase      p50    p95    p99 (ms)"]
+        for name, (p50, p95, p99) in self.summary().items():
+            lines.append(f"{name:<9}{p50:>6.2f} {p95:>6.2f} {p99:>6.2f}")
+        if self.frames:
+            last = self.frames[-1]
+            lines.append(f"live {last['live_lasers']}  dead {last['dead_lasers']}  "
+                         f"alloc {last['allocations']:+d}")
+        rects = []
+        for line in lines:
+            text = font.render(line, True, (255, 255, 0), (0, 0, 0))
+            rects.append(surface.blit(text, (x, y)))
+            y += text.get_height()
+        return rects
+
+
+class NullProfiler:
+    """Drop-in FrameProfiler that records nothing."""
+
+    overlay_visible = False
+    _phase = nullcontext()
+
+    def phase(self, name):
+        return self._phase
+
+    def begin_frame(self):
+        pass
+
+    def end_frame(self, lasers=None):
+        pass
+
+    def draw_overlay(self, surface, font, pos=(10, 40)):
+        return []
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,182 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+
+class LaserRenderer:
+    """Draws a LaserPool with cached pre-rotated sprites and one ``blits`` call.
+
+    Sprites are keyed by (colour, width, length, quantized angle) and kept
+    in an LRU cache, so a steady pattern renders without any per-frame
+    surface work. Lasers whose box misses the target surface are skipped.
+    """
+
+    def __init__(self, angle_steps=128, cache_size=1024):
+        self.angle_steps = angle_steps
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.drawn = 0
+        self.culled = 0
+
+    def sprite(self, color, width, length, step):
+        key = (color, width, length, step)
+        sprite = self.cache.get(key)
+        if sprite is not None:
+            self.cache.move_to_end(key)
+            return sprite
+        strip = pygame.Surface((max(1, length), max(1, width)))
+        strip.fill(color)
+        # Colour-keyed RLE sprites blit much faster than per-pixel alpha
+        colorkey = (0, 0, 0) if color != (0, 0, 0) else (255, 0, 255)
+        strip.set_colorkey(colorkey)
+        degrees = step * 360.0 / self.angle_steps
+        # pygame rotates counter-clockwise while screen y points down
+        sprite = pygame.transform.rotate(strip, -degrees)
+        sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        self.cache[key] = sprite
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return sprite
+
+    def draw(self, surface, pool, alpha=1.0):
+        """Draw every visible laser; returns the list of rects touched.
+
+        ``alpha`` blends from each laser's position before the last update
+        (0) to its current one (1), for rendering between simulation ticks.
+        """
+        slots = pool.active_slots()
+        if slots.size == 0:
+            self.drawn = self.culled = 0
+            return []
+        x = pool.x[slots]
+        y = pool.y[slots]
+        if alpha < 1.0:
+            prev_x = pool.prev_x[slots]
+            prev_y = pool.prev_y[slots]
+            x = prev_x + (x - prev_x) * alpha
+            y = prev_y + (y - prev_y) * alpha
+        length = pool.length[slots]
+        dx = pool.cos[slots] * length
+        dy = pool.sin[slots] * length
+        pad = pool.width[slots]
+        screen_w, screen_h = surface.get_size()
+        visible = ((np.minimum(x, x + dx) - pad < screen_w) & (np.maximum(x, x + dx) + pad > 0) &
+                   (np.minimum(y, y + dy) - pad < screen_h) & (np.maximum(y, y + dy) + pad > 0))
+        self.culled = int(slots.size - visible.sum())
+        slots = slots[visible]
+        self.drawn = int(slots.size)
+        if slots.size == 0:
+            return []
+
+        steps = np.rint(pool.angle[slots] * (self.angle_steps / (2 * math.pi))).astype(np.int64)
+        steps %= self.angle_steps
+        width = pool.width[slots].astype(np.int64)
+        length_px = np.rint(pool.length[slots]).astype(np.int64)
+        # Pack each sprite key into one integer so unique() groups them in C
+        keys = ((pool.color[slots].astype(np.int64) * 4096 + width) * 65536 + length_px) \
+            * self.angle_steps + steps
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        palette = pool.palette
+        color_ids = pool.color[slots][first].tolist()
+        sprites = [self.sprite(palette[c], w, l, s) for c, w, l, s in
+                   zip(color_ids, width[first].tolist(), length_px[first].tolist(), steps[first].tolist())]
+
+        mid_x = x[visible] + dx[visible] * 0.5
+        mid_y = y[visible] + dy[visible] * 0.5
+        sizes = np.array([s.get_size() for s in sprites], dtype=np.float64)[inverse]
+        left = (mid_x - sizes[:, 0] * 0.5).astype(np.int32).tolist()
+        top = (mid_y - sizes[:, 1] * 0.5).astype(np.int32).tolist()
+        per_laser = [sprites[i] for i in inverse.tolist()]
+        return surface.blits(list(zip(per_laser, zip(left, top))))
+
+
+class LayeredScreen:
+    """Dirty-rectangle compositor over a static background layer.
+
+    Each frame the regions drawn last frame are restored from the
+    background, the dynamic layers (lasers, player, HUD) are drawn on top
+    and registered with ``add``, and ``present`` pushes only the changed
+    regions with ``pygame.display.update``. When those cover more than
+    ``full_update_ratio`` of the screen a full fill and flip is cheaper, so
+    it falls back to that.
+
+    Items added with a ``key`` (static HUD text, say) are only pushed when
+    their key or position changes, since redrawing them over their own
+    restored background leaves the pixels unchanged.
+    """
+
+    def __init__(self, screen, background=(0, 0, 0), full_update_ratio=0.35):
+        self.screen = screen
+        self.full_update_ratio = full_update_ratio
+        self.screen_area = screen.get_width() * screen.get_height()
+        self.set_background(background)
+        self._drawn = []
+        self._dynamic = []
+        self._keyed = {}
+        self._prev_drawn = []
+        self._prev_dynamic = []
+        self._prev_keyed = {}
+        self.full_updates = 0
+        self.partial_updates = 0
+
+    def set_background(self, background):
+        if isinstance(background, pygame.Surface):
+            self.background = background
+        else:
+            self.background = pygame.Surface(self.screen.get_size()).convert()
+            self.background.fill(background)
+        self.invalidate()
+
+    def invalidate(self):
+        """Force the next frame to repaint and flip the whole screen."""
+        self._full = True
+
+    def begin_frame(self):
+        erase = self._prev_drawn
+        if self._full or _area(erase) > self.full_update_ratio * self.screen_area:
+            self.screen.blit(self.background, (0, 0))
+        elif erase:
+            background = self.background
+            self.screen.blits([(background, rect, rect) for rect in erase], doreturn=False)
+        self._drawn = []
+        self._dynamic = []
+        self._keyed = {}
+
+    def add(self, rect, key=None):
+        """Register a region drawn this frame; returns ``rect``."""
+        self._drawn.append(rect)
+        if key is None:
+            self._dynamic.append(rect)
+        else:
+            self._keyed[key] = rect
+        return rect
+
+    def add_many(self, rects):
+        self._drawn.extend(rects)
+        self._dynamic.extend(rects)
+
+    def present(self):
+        keyed, prev_keyed = self._keyed, self._prev_keyed
+        push = self._prev_dynamic + self._dynamic
+        push += [rect for key, rect in keyed.items() if prev_keyed.get(key) != rect]
+        push += [rect for key, rect in prev_keyed.items() if keyed.get(key) != rect]
+        if self._full or _area(push) > self.full_update_ratio * self.screen_area:
+            pygame.display.flip()
+            self.full_updates += 1
+        else:
+            if push:
+                pygame.display.update(push)
+            self.partial_updates += 1
+        self._full = False
+        self._prev_drawn = self._drawn
+        self._prev_dynamic = self._dynamic
+        self._prev_keyed = keyed
+
+
+def _area(rects):
+    # Overlaps are counted twice, which only makes the fallback kick in sooner
+    return sum(rect.width * rect.height for rect in rects)
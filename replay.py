@@ -0,0 +1,222 @@
+"""Record bullet_hell_game inputs and replay them deterministically.
+
+A replay holds the simulation seed, the pattern source and the per-frame
+input masks (see simulation.ACTIONS), run-length encoded::
+
+    header   "BHRP", version u8, reserved u8, fps u16, seed u64, source length u16
+    source   utf-8 pattern source ("builtin" or a pattern script path)
+    frames   u32 total frame count, u32 run count
+    runs     (mask u8, length u32) per run
+
+    python replay.py replays/run.bhr                 # uncapped, headless
+    python replay.py replays/run.bhr --render        # watch it
+    python replay.py replays/run.bhr --seek 50000    # jump, then continue
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from game_patterns import LEVEL_PATTERNS
+from pattern_scripts import PATTERN_DIR, load_patterns
+from profiler import FrameProfiler, NULL_PROFILER
+from simulation import Simulation
+
+MAGIC = b"BHRP"
+# Bumped whenever the simulation rules change, since old inputs would play out differently
+VERSION = 3
+HEADER = struct.Struct("<4sBBHQH")
+COUNTS = struct.Struct("<II")
+RUN_DTYPE = np.dtype([("mask", "u1"), ("length", "<u4")])
+
+BUILTIN = "builtin"
+REPLAY_DIR = "replays"
+
+
+class ReplayError(ValueError):
+    pass
+
+
+def pattern_source(path):
+    """Name a pattern script the way replays store it, relative to PATTERN_DIR when inside it."""
+    if path is None:
+        return BUILTIN
+    rel = os.path.relpath(path, PATTERN_DIR)
+    return path if rel.startswith("..") else rel
+
+
+def resolve_patterns(source, fps):
+    if source == BUILTIN:
+        return LEVEL_PATTERNS
+    return load_patterns(source if os.path.isabs(source) else os.path.join(PATTERN_DIR, source), fps)
+
+
+class Replay:
+    def __init__(self, seed, fps, source, inputs):
+        self.seed = seed
+        self.fps = fps
+        self.source = source
+        self.inputs = inputs    # uint8 array, one input mask per frame
+
+    def __len__(self):
+        return self.inputs.size
+
+    def new_simulation(self):
+        return Simulation(self.seed, patterns=resolve_patterns(self.source, self.fps), fps=self.fps)
+
+    def save(self, path):
+        inputs = self.inputs
+        if inputs.size:
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(inputs)) + 1))
+            runs = np.empty(starts.size, dtype=RUN_DTYPE)
+            runs["mask"] = inputs[starts]
+            runs["length"] = np.diff(np.append(starts, inputs.size))
+        else:
+            runs = np.empty(0, dtype=RUN_DTYPE)
+        source = self.source.encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, self.fps, self.seed, len(source)))
+            f.write(source)
+            f.write(COUNTS.pack(inputs.size, runs.size))
+            f.write(runs.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER.size or data[:4] != MAGIC:
+            raise ReplayError(f"{path} is not a replay file")
+        magic, version, _, fps, seed, source_len = HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ReplayError(f"unsupported replay version {version}")
+        offset = HEADER.size
+        source = data[offset:offset + source_len].decode("utf-8")
+        offset += source_len
+        frames, run_count = COUNTS.unpack_from(data, offset)
+        offset += COUNTS.size
+        runs = np.frombuffer(data, dtype=RUN_DTYPE, count=run_count, offset=offset)
+        inputs = np.repeat(runs["mask"], runs["length"])
+        if inputs.size != frames:
+            raise ReplayError(f"{path} is truncated")
+        return cls(seed, fps, source, inputs)
+
+
+class ReplayRecorder:
+    """Collects one input mask per simulated frame during a live run."""
+
+    def __init__(self, seed, fps, source=BUILTIN):
+        self.seed = seed
+        self.fps = fps
+        self.source = source
+        self.inputs = bytearray()
+
+    def record(self, inputs):
+        self.inputs.append(inputs)
+
+    def replay(self):
+        return Replay(self.seed, self.fps, self.source, np.frombuffer(bytes(self.inputs), dtype=np.uint8))
+
+    def save(self, directory=REPLAY_DIR):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"run_{time.strftime('%Y%m%d-%H%M%S')}_{self.seed}.bhr")
+        self.replay().save(path)
+        return path
+
+
+class ReplayPlayer:
+    """Steps a replay's simulation, keeping snapshots every ``snapshot_interval``
+    frames so ``seek`` resumes from the nearest one instead of frame 0."""
+
+    def __init__(self, replay, snapshot_interval=600):
+        self.replay = replay
+        self.sim = replay.new_simulation()
+        self.snapshot_interval = snapshot_interval
+        self.snapshots = {0: self.sim.snapshot()}
+
+    @property
+    def frame(self):
+        return self.sim.frame
+
+    def done(self):
+        return self.sim.frame >= len(self.replay) or not self.sim.player.alive
+
+    def step(self):
+        sim = self.sim
+        alive = sim.step(int(self.replay.inputs[sim.frame]))
+        if sim.frame % self.snapshot_interval == 0 and sim.frame not in self.snapshots:
+            self.snapshots[sim.frame] = sim.snapshot()
+        return alive
+
+    def seek(self, frame):
+        frame = max(0, min(frame, len(self.replay)))
+        base = max(f for f in self.snapshots if f <= frame)
+        if not base <= self.sim.frame <= frame:
+            self.sim.restore(self.snapshots[base])
+        while self.sim.frame < frame and not self.done():
+            self.step()
+
+
+def play(replay, render=False, seek=0, profiler=NULL_PROFILER):
+    """Run a replay to the end at uncapped speed; return (player, seconds)."""
+    player = ReplayPlayer(replay)
+    start = time.perf_counter()
+    player.seek(seek)
+    # Only profile from the seek point on, so the trace matches what is played
+    player.sim.profiler = profiler
+    if not render:
+        while not player.done():
+            profiler.begin_frame()
+            player.step()
+            profiler.end_frame(player.sim.lasers)
+        return player, time.perf_counter() - start
+
+    import pygame
+    from renderer import LaserRenderer
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 800))
+    font = pygame.font.SysFont(None, 32)
+    renderer = LaserRenderer()
+    while not player.done():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return player, time.perf_counter() - start
+        profiler.begin_frame()
+        player.step()
+        with profiler.phase("draw"):
+            screen.fill((0, 0, 0))
+            renderer.draw(screen, player.sim.lasers)
+            player.sim.player.draw(screen, font, replay.fps)
+        with profiler.phase("flip"):
+            pygame.display.flip()
+        profiler.end_frame(player.sim.lasers)
+    pygame.quit()
+    return player, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded run")
+    parser.add_argument("path")
+    parser.add_argument("--render", action="store_true", help="draw frames (still uncapped)")
+    parser.add_argument("--seek", type=int, default=0, help="start from this frame")
+    parser.add_argument("--profile", metavar="TRACE", help="write a frame profile as TRACE.csv/.json")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.path)
+    profiler = FrameProfiler(history=len(replay)) if args.profile else NULL_PROFILER
+    player, elapsed = play(replay, args.render, args.seek, profiler)
+    sim = player.sim
+    frames = sim.frame - args.seek
+    outcome = "died" if not sim.player.alive else "survived"
+    print(f"seed {replay.seed}, {len(replay)} recorded frames, {outcome} at frame {sim.frame}; "
+          f"{frames} frames in {elapsed:.2f}s ({frames / max(elapsed, 1e-9):,.0f} frames/s)")
+    if args.profile:
+        profiler.export_csv(args.profile + ".csv")
+        profiler.export_json(args.profile + ".json")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
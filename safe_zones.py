@@ -0,0 +1,251 @@
+"""Offline occupancy and reachability analysis of level patterns.
+
+    python safe_zones.py --seed 0 --out analysis
+    python safe_zones.py --strict          # exit 1 if a pattern can't be survived
+
+Each pattern of the level the game plays (see pattern_scripts.default_level)
+runs alone for its level duration with a fixed seed. Every
+frame, each CELL x CELL cell of the playfield is marked occupied if a
+laser could touch a player hitbox anywhere in it, and the frames are
+stored bit-packed in a memory-mapped ``.npy`` (one row per frame).
+
+Reachability then walks the frames forward over (cell, dash cooldown)
+states: walking moves one cell straight per ``CELL / Player.speed``
+frames or diagonally per ``sqrt(2)`` times that, and a dash jumps
+``dash_distance`` in one of eight directions through cells that must all
+be clear. A pattern with no surviving state at its last frame is reported
+as unwinnable. Both the occupancy and the walk are cell-level
+approximations. The occupancy errs toward "occupied". The walk is
+approximate both ways: a player is somewhere inside a cell, so one near
+an edge could step sooner than the walk allows, and diagonal dashes round
+to whole cells.
+
+``SafeZoneMap`` loads a stored occupancy for cheap runtime lookups.
+Deterministic patterns match live play exactly; for random ones the map
+is the sample drawn with the analysis seed.
+"""
+import argparse
+import math
+import os
+import sys
+
+import numpy as np
+
+from collision import point_segment_distance
+from pattern_scripts import default_level
+from player import Player, WIDTH, HEIGHT
+from simulation import Simulation
+
+CELL = 16
+ROWS, COLS = HEIGHT // CELL, WIDTH // CELL
+DIRECTIONS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+# Cell centres, flattened row-major like the packed bitmaps
+_CENTER_X = (np.arange(COLS) + 0.5) * CELL
+_CENTER_Y = (np.arange(ROWS) + 0.5) * CELL
+
+
+def rasterize(pool, radius):
+    """Boolean (ROWS, COLS) map of cells a laser in ``pool`` could hit."""
+    occupied = np.zeros((ROWS, COLS), dtype=bool)
+    slots = pool.active_slots()
+    if slots.size == 0:
+        return occupied
+    x = pool.x[slots]
+    y = pool.y[slots]
+    dx = pool.cos[slots] * pool.length[slots]
+    dy = pool.sin[slots] * pool.length[slots]
+    # Anywhere in the cell counts, so pad by half its diagonal
+    reach = radius + pool.width[slots] // 2 + CELL * math.sqrt(0.5)
+    col0 = np.floor((np.minimum(x, x + dx) - reach) / CELL).astype(np.int64)
+    row0 = np.floor((np.minimum(y, y + dy) - reach) / CELL).astype(np.int64)
+    span = int(math.ceil((pool.length[slots].max() + 2 * reach.max()) / CELL)) + 1
+    # A span x span window of cells per laser, tested all at once
+    offsets = np.arange(span)
+    shape = (slots.size, span, span)
+    cols = np.broadcast_to(col0[:, None, None] + offsets[None, None, :], shape)
+    rows = np.broadcast_to(row0[:, None, None] + offsets[None, :, None], shape)
+    inside = (cols >= 0) & (cols < COLS) & (rows >= 0) & (rows < ROWS)
+    cx = (cols + 0.5) * CELL
+    cy = (rows + 0.5) * CELL
+    dist = point_segment_distance(cx, cy, x[:, None, None], y[:, None, None],
+                                  dx[:, None, None], dy[:, None, None])
+    hit = inside & (dist <= reach[:, None, None])
+    occupied[rows[hit], cols[hit]] = True
+    return occupied
+
+
+def record_occupancy(pattern, duration, path, seed=0, fps=60):
+    """Simulate ``pattern`` alone and write its packed occupancy to ``path``.
+
+    Returns the memmap, shaped (frames, ceil(ROWS * COLS / 8)) of uint8.
+    Row ``f`` is the field after pattern frame ``f + 1`` (PatternSwitcher
+    counts from 1), i.e. what that frame's collision check sees.
+    """
+    sim = Simulation(seed, patterns=[(pattern, duration)], fps=fps)
+    frames = int(round(duration * fps))
+    radius = sim.player.hitbox_radius
+    packed = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8,
+                                       shape=(frames, (ROWS * COLS + 7) // 8))
+    for frame in range(frames):
+        sim.spawn()
+        sim.lasers.update()
+        packed[frame] = np.packbits(rasterize(sim.lasers, radius))
+    packed.flush()
+    return packed
+
+
+def _shift(grid, dx, dy):
+    """Move every True cell by (dx, dy) cells on the last two axes; edges drop off."""
+    out = np.zeros_like(grid)
+    h, w = grid.shape[-2:]
+    if abs(dx) >= w or abs(dy) >= h:
+        return out
+    src_y = slice(max(0, -dy), h - max(0, dy))
+    dst_y = slice(max(0, dy), h - max(0, -dy))
+    src_x = slice(max(0, -dx), w - max(0, dx))
+    dst_x = slice(max(0, dx), w - max(0, -dx))
+    out[..., dst_y, dst_x] = grid[..., src_y, src_x]
+    return out
+
+
+def reachability(packed, player=None, start=None):
+    """Walk the occupancy forward; return the number of reachable cells per frame.
+
+    ``start`` is a pixel position, or None to start from every clear cell.
+    A zero anywhere means the pattern kills every player by that frame.
+    """
+    player = player or Player(WIDTH // 2, HEIGHT // 2)
+    frames = packed.shape[0]
+    cooldown = player.dash_cooldown
+    straight = max(1, round(player.dash_distance / CELL))
+    diagonal = max(1, round(player.dash_distance * 0.7071 / CELL))
+    frames_per_cell = CELL / player.speed
+    frames_per_diagonal = frames_per_cell * math.sqrt(2)
+
+    def stepped(frame, period):
+        return int(frame / period) != int((frame - 1) / period)
+
+    def safe(frame):
+        return np.unpackbits(packed[frame], count=ROWS * COLS).reshape(ROWS, COLS) == 0
+
+    # states[k] = cells reachable with k frames left before a dash is ready;
+    # a dash sets the timer and the same step ticks it once
+    states = np.zeros((max(1, cooldown), ROWS, COLS), dtype=bool)
+    if start is None:
+        states[0] = safe(0)
+    else:
+        states[0, int(start[1]) // CELL, int(start[0]) // CELL] = True
+        states[0] &= safe(0)
+    counts = np.zeros(frames, dtype=np.int64)
+    counts[0] = states.any(axis=0).sum()
+    for frame in range(1, frames):
+        clear = safe(frame)
+        ready = states[0].copy()
+        # Cooldowns tick down; the ready layer keeps what was already ready
+        states[:-1] = states[1:]
+        states[-1] = False
+        states[0] |= ready
+        step_straight = stepped(frame, frames_per_cell)
+        step_diagonal = stepped(frame, frames_per_diagonal)
+        if step_straight or step_diagonal:
+            walked = states.copy()
+            for dx, dy in DIRECTIONS:
+                if step_diagonal if dx and dy else step_straight:
+                    walked |= _shift(states, dx, dy)
+            states = walked
+        dashed = np.zeros((ROWS, COLS), dtype=bool)
+        for dx, dy in DIRECTIONS:
+            cur = ready
+            for _ in range(straight if dx == 0 or dy == 0 else diagonal):
+                cur = _shift(cur, dx, dy) & clear
+            dashed |= cur
+        states[-1] |= dashed
+        states &= clear
+        counts[frame] = states.any(axis=0).sum()
+        if counts[frame] == 0:
+            break
+    return counts
+
+
+class SafeZoneMap:
+    """Runtime lookups into an occupancy file written by ``record_occupancy``."""
+
+    def __init__(self, path):
+        self.packed = np.load(path, mmap_mode="r")
+
+    def __len__(self):
+        return self.packed.shape[0]
+
+    def occupied(self, pattern_frame, x, y):
+        """True if a laser may be near (x, y) on this 1-based pattern frame."""
+        row = self.packed[min(pattern_frame, len(self)) - 1]
+        col = min(max(int(x) // CELL, 0), COLS - 1)
+        index = min(max(int(y) // CELL, 0), ROWS - 1) * COLS + col
+        return bool(row[index >> 3] >> (7 - (index & 7)) & 1)
+
+    def safe_cells(self, pattern_frame):
+        row = self.packed[min(pattern_frame, len(self)) - 1]
+        return np.unpackbits(row, count=ROWS * COLS).reshape(ROWS, COLS) == 0
+
+    def nearest_safe(self, pattern_frame, x, y):
+        """Centre of the clear cell closest to (x, y), or None if none are clear."""
+        rows, cols = np.nonzero(self.safe_cells(pattern_frame))
+        if rows.size == 0:
+            return None
+        d2 = (_CENTER_X[cols] - x) ** 2 + (_CENTER_Y[rows] - y) ** 2
+        i = int(np.argmin(d2))
+        return float(_CENTER_X[cols[i]]), float(_CENTER_Y[rows[i]])
+
+
+def analyze(patterns=None, out="analysis", seed=0, fps=60):
+    """Record and check every pattern (default: the level the game plays);
+    return {name: result dict}."""
+    if patterns is None:
+        patterns = default_level(fps)[0]
+    os.makedirs(out, exist_ok=True)
+    results = {}
+    for pattern, duration in patterns:
+        name = pattern.__name__
+        path = os.path.join(out, f"{name}.npy")
+        packed = record_occupancy(pattern, duration, path, seed, fps)
+        from_anywhere = reachability(packed)
+        from_start = reachability(packed, start=(WIDTH // 2, HEIGHT // 2))
+        bits = np.unpackbits(packed, axis=1, count=ROWS * COLS)
+        results[name] = {
+            "path": path,
+            "frames": packed.shape[0],
+            "occupancy": float(bits.mean()),
+            "peak_occupancy": float(bits.mean(axis=1).max()),
+            "winnable": bool(from_anywhere[-1] > 0),
+            "winnable_from_start": bool(from_start[-1] > 0),
+            "min_reachable_cells": int(from_anywhere.min()),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pattern safe-zone analysis")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="analysis", help="directory for occupancy files")
+    parser.add_argument("--script", metavar="PATH", help="analyze a pattern file instead")
+    parser.add_argument("--strict", action="store_true", help="exit 1 if any pattern is unwinnable")
+    args = parser.parse_args(argv)
+
+    patterns = None
+    if args.script:
+        from pattern_scripts import load_patterns
+        patterns = load_patterns(args.script)
+    results = analyze(patterns, args.out, args.seed)
+    print(f"{'pattern':<22}{'frames':>7}{'occupied':>10}{'peak':>7}{'min cells':>10}  winnable")
+    for name, r in results.items():
+        verdict = "yes" if r["winnable_from_start"] else ("from elsewhere" if r["winnable"] else "NO")
+        print(f"{name:<22}{r['frames']:>7}{r['occupancy']:>10.1%}{r['peak_occupancy']:>7.1%}"
+              f"{r['min_reachable_cells']:>10}  {verdict}")
+    if args.strict and not all(r["winnable"] for r in results.values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
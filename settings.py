@@ -1,37 +1,236 @@
+import atexit
+import copy
 import json
 import os
+import tempfile
+import threading
 
 SETTINGS_FILE = "user_settings.json"
 
+# Display refresh rates the renderer can target; gameplay always ticks at 60 Hz
+RENDER_RATES = (30, 60, 120, 144, 240)
+
 DEFAULT_SETTINGS = {
     "volume": 0.5,
     "screen_width": 800,
     "screen_height": 600,
     "fullscreen": False,
+    "render_rate": 60,
+    "profiler": False,
+    "record_replays": False,
     "key_bindings": {
         "move_left": "a",
         "move_right": "d",
         "move_up": "w",
         "move_down": "s",
         "dash": "space"
+    },
+    "gamepad_bindings": {
+        "move_left": ["axis:0:-", "hat:0:left"],
+        "move_right": ["axis:0:+", "hat:0:right"],
+        "move_up": ["axis:1:-", "hat:0:up"],
+        "move_down": ["axis:1:+", "hat:0:down"],
+        "dash": ["button:0"]
     }
 }
 
+def _merged(settings):
+    """Defaults deep-copied, with ``settings`` layered on top one level deep."""
+    merged = copy.deepcopy(DEFAULT_SETTINGS)
+    for key, value in settings.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key].update(copy.deepcopy(value))
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+def _read(path):
+    try:
+        with open(path, "r") as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return settings if isinstance(settings, dict) else {}
+
+def _write_atomic(path, text):
+    # Write beside the target and rename over it, so a crash mid-write
+    # never leaves a truncated settings file
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
 def load_settings():
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, "r") as f:
-            try:
-                settings = json.load(f)
-                merged = DEFAULT_SETTINGS.copy()
-                merged.update(settings)
-                if "key_bindings" in settings:
-                    merged["key_bindings"].update(settings["key_bindings"])
-                return merged
-            except Exception:
-                return DEFAULT_SETTINGS.copy()
-    else:
-        return DEFAULT_SETTINGS.copy()
+    return _merged(_read(SETTINGS_FILE))
 
 def save_settings(settings):
-    with open(SETTINGS_FILE, "w") as f:
-        json.dump(settings, f, indent=4)
\ No newline at end of file
+    _write_atomic(SETTINGS_FILE, json.dumps(settings, indent=4))
+
+
+class SettingsStore:
+    """Settings held in memory, saved in the background and reloaded on change.
+
+    Reads never touch the disk. ``set`` updates the value, calls listeners
+    registered with ``subscribe`` as ``callback(key, value)`` and schedules
+    a write ``delay`` seconds later on a timer thread, so a burst of changes
+    costs one write. ``reload_if_changed`` picks up edits made to the file
+    by hand; it only stats the file unless the mtime moved.
+    """
+
+    def __init__(self, path=SETTINGS_FILE, delay=0.5):
+        self.path = path
+        self.delay = delay
+        self.data = _merged(_read(path))
+        self._mtime = self._stat()
+        self._listeners = []
+        # _lock guards the data and timer and is never held across disk I/O;
+        # _write_lock only keeps writers from overlapping
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._version = 0       # bumped per flush, so a stale write is skipped
+        self._written = 0
+        self._writing = 0
+        self.writes = 0
+        atexit.register(self.flush)
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def _notify(self, key):
+        for callback in self._listeners:
+            callback(key, self.data[key])
+
+    def set(self, key, value):
+        with self._lock:
+            self.data[key] = copy.deepcopy(value)
+        self._notify(key)
+        self._schedule_save()
+
+    def set_binding(self, action, key_name):
+        with self._lock:
+            self.data["key_bindings"][action] = key_name
+        self._notify("key_bindings")
+        self._schedule_save()
+
+    def _schedule_save(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write pending changes now; a no-op when nothing is pending."""
+        with self._lock:
+            if self._timer is None:
+                return
+            self._timer.cancel()
+            self._timer = None
+            text = json.dumps(self.data, indent=4)
+            self._version += 1
+            version = self._version
+            self._writing += 1
+        try:
+            with self._write_lock:
+                if version > self._written:
+                    _write_atomic(self.path, text)
+                    self._written = version
+                    self.writes += 1
+                    mtime = self._stat()
+                    with self._lock:
+                        self._mtime = mtime
+        finally:
+            with self._lock:
+                self._writing -= 1
+
+    def reload_if_changed(self):
+        """Reload if the file changed behind our back; return True if it did."""
+        mtime = self._stat()
+        if mtime == self._mtime or self._timer is not None or self._writing:
+            return False
+        with self._lock:
+            if mtime == self._mtime or self._timer is not None or self._writing:
+                return False
+            old = self.data
+            self.data = _merged(_read(self.path))
+            self._mtime = mtime
+        for key, value in self.data.items():
+            if old.get(key) != value:
+                self._notify(key)
+        return True
+
+def _type_ok(value, default):
+    if isinstance(default, bool) or isinstance(value, bool):
+        return isinstance(value, bool) and isinstance(default, bool)
+    if isinstance(default, (int, float)):
+        return isinstance(value, (int, float))
+    return isinstance(value, type(default))
+
+def parse_pad_spec(spec):
+    """Split a gamepad binding such as "axis:0:-" into (kind, index, arg).
+
+    Returns None for a malformed spec. InputMapper and validate_settings
+    both use this, so the game skips exactly what the validator reports.
+    """
+    if not isinstance(spec, str):
+        return None
+    kind, _, rest = spec.partition(":")
+    index, _, arg = rest.partition(":")
+    valid = index.isdigit() and (
+        (kind == "axis" and arg in ("-", "+")) or
+        (kind == "hat" and arg in ("left", "right", "up", "down")) or
+        (kind == "button" and not arg))
+    return (kind, int(index), arg) if valid else None
+
+def validate_settings(settings):
+    """Return a list of problems with a settings mapping; empty means valid."""
+    problems = []
+    for key, value in settings.items():
+        if key not in DEFAULT_SETTINGS:
+            problems.append(f"unknown setting {key!r}")
+        elif not _type_ok(value, DEFAULT_SETTINGS[key]):
+            problems.append(f"{key} should be {type(DEFAULT_SETTINGS[key]).__name__}, got {value!r}")
+    if settings.get("render_rate", 60) not in RENDER_RATES:
+        problems.append(f"render_rate should be one of {RENDER_RATES}, got {settings['render_rate']!r}")
+    actions = DEFAULT_SETTINGS["key_bindings"]
+    # A non-dict binding table was already reported as the wrong type above
+    key_bindings = settings.get("key_bindings")
+    for action, key_name in (key_bindings.items() if isinstance(key_bindings, dict) else ()):
+        if action not in actions:
+            problems.append(f"unknown action {action!r} in key_bindings")
+        elif not isinstance(key_name, str) or not key_name:
+            problems.append(f"key binding for {action} should be a key name, got {key_name!r}")
+    pad_bindings = settings.get("gamepad_bindings")
+    for action, specs in (pad_bindings.items() if isinstance(pad_bindings, dict) else ()):
+        if action not in actions:
+            problems.append(f"unknown action {action!r} in gamepad_bindings")
+            continue
+        if not isinstance(specs, (str, list)):
+            problems.append(f"gamepad binding for {action} should be a spec or a list of specs, "
+                            f"got {specs!r}")
+            continue
+        for spec in [specs] if isinstance(specs, str) else specs:
+            if parse_pad_spec(spec) is None:
+                problems.append(f"bad gamepad binding {spec!r} for {action}")
+    return problems
@@ -0,0 +1,181 @@
+import random
+import struct
+
+import numpy as np
+
+from game_patterns import PatternSwitcher
+from laser_pool import LaserPool
+from pattern_scripts import default_level
+from player import Player, WIDTH, HEIGHT
+from profiler import NULL_PROFILER
+
+# Fixed bit layout for one frame of input; DASH means "dash pressed this frame"
+ACTIONS = ("move_left", "move_right", "move_up", "move_down", "dash")
+MOVE_LEFT, MOVE_RIGHT, MOVE_UP, MOVE_DOWN, DASH = (1 << i for i in range(len(ACTIONS)))
+
+# Compact save states: header, then the RNG words, palette, free list and
+# the first ``count`` entries of each LaserPool field, all little-endian
+STATE_MAGIC = b"BHSS"
+STATE_VERSION = 1
+STATE_HEADER = struct.Struct("<4sBqqqqddddq?dqqqqq")
+_RNG_WORDS = 625
+_FIELD_DTYPES = {"x": "<f8", "y": "<f8", "angle": "<f8", "speed": "<f8", "width": "<i4",
+                 "length": "<f8", "color": "<i2", "active": "?", "cos": "<f8", "sin": "<f8",
+                 "prev_x": "<f8", "prev_y": "<f8", "owner": "<i4"}
+
+# One prebuilt keymap per input mask, so a step never builds a dict
+_KEYMAPS = [{action: bool(mask & (1 << i)) for i, action in enumerate(ACTIONS)}
+            for mask in range(1 << len(ACTIONS))]
+
+
+def run_pattern(pattern, pool, frame, rng, target):
+    """Spawn one frame of ``pattern`` into ``pool``.
+
+    A pattern is either a function ``(frame, rng) -> [Laser, ...]`` or an
+    object whose ``emit(pool, frame, rng)`` writes straight into the pool.
+    Objects with ``aims = True`` also get ``target``, the player's position.
+    """
+    emit = getattr(pattern, "emit", None)
+    if emit is not None:
+        if getattr(pattern, "aims", False):
+            emit(pool, frame, rng, target)
+        else:
+            emit(pool, frame, rng)
+        return
+    new_lasers = pattern(frame, rng)
+    if new_lasers:
+        pool.extend(new_lasers)
+
+
+class Simulation:
+    """Game state for one run of bullet_hell_game, advanced one frame per step.
+
+    Nothing here touches pygame, and all randomness comes from ``self.rng``,
+    so two simulations with the same seed and inputs stay in lockstep.
+    ``patterns`` defaults to the level the game plays (see default_level).
+    """
+
+    def __init__(self, seed=None, patterns=None, fps=60, width=WIDTH, height=HEIGHT):
+        if patterns is None:
+            patterns = default_level(fps)[0]
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.fps = fps
+        self.player = Player(width // 2, height // 2)
+        self.pattern_switcher = PatternSwitcher(patterns, fps=fps)
+        self.lasers = LaserPool()
+        self.frame = 0
+        self.profiler = NULL_PROFILER
+
+    def spawn(self):
+        """Run the current pattern for this frame."""
+        pattern, pattern_frame = self.pattern_switcher.get_current_pattern()
+        run_pattern(pattern, self.lasers, pattern_frame, self.rng, (self.player.x, self.player.y))
+
+    def step(self, inputs=0):
+        """Advance one frame with an input mask; return True while the player lives."""
+        player = self.player
+        if not player.alive:
+            return False
+        keymap = _KEYMAPS[inputs]
+        player.prev_x = player.x
+        player.prev_y = player.y
+        if inputs & DASH:
+            player.dash(keymap)
+        player.handle_input(keymap)
+        player.update_dash_timer()
+        profiler = self.profiler
+        with profiler.phase("spawn"):
+            self.spawn()
+        with profiler.phase("update"):
+            self.lasers.update()
+        self.frame += 1
+        with profiler.phase("collision"):
+            if player.is_hit(self.lasers):
+                player.alive = False
+        return player.alive
+
+    def snapshot(self):
+        """Capture everything step() depends on, for restore() or replay seeking.
+
+        Cheap enough to take often: the lasers are shared copy-on-write (see
+        LaserPool.snapshot). Restoring the same snapshot twice is fine.
+        """
+        switcher = self.pattern_switcher
+        return {
+            "frame": self.frame,
+            "rng": self.rng.getstate(),
+            "player": dict(vars(self.player)),
+            "switcher": (switcher.current_index, switcher.frame, switcher.pattern_timer),
+            "lasers": self.lasers.snapshot(),
+        }
+
+    def restore(self, state):
+        self.frame = state["frame"]
+        self.rng.setstate(state["rng"])
+        vars(self.player).update(state["player"])
+        switcher = self.pattern_switcher
+        switcher.current_index, switcher.frame, switcher.pattern_timer = state["switcher"]
+        self.lasers.restore(state["lasers"])
+
+
+class StateError(ValueError):
+    pass
+
+
+def pack_state(state):
+    """Serialize a Simulation snapshot to bytes; see ``unpack_state``.
+
+    Only the player's moving parts are stored, so the state must be
+    restored into a Simulation built with the same patterns and fps.
+    """
+    player = state["player"]
+    lasers = state["lasers"]
+    version, words, gauss = state["rng"]
+    n = lasers["count"]
+    header = STATE_HEADER.pack(
+        STATE_MAGIC, STATE_VERSION, state["frame"], *state["switcher"],
+        player["x"], player["y"], player["prev_x"], player["prev_y"], player["dash_timer"],
+        player["alive"], float("nan") if gauss is None else gauss,
+        n, lasers["live"], lasers["spawned"], len(lasers["free"]), len(lasers["palette"]))
+    parts = [header, np.asarray(words, dtype="<u4").tobytes(),
+             np.asarray(lasers["palette"], dtype=np.uint8).tobytes(),
+             np.asarray(lasers["free"], dtype="<i4").tobytes()]
+    parts.extend(np.ascontiguousarray(lasers[name][:n], dtype=dtype).tobytes()
+                 for name, dtype in _FIELD_DTYPES.items())
+    return b"".join(parts)
+
+
+def unpack_state(data):
+    """Rebuild a snapshot dict from ``pack_state`` bytes, ready for Simulation.restore."""
+    if len(data) < STATE_HEADER.size or data[:4] != STATE_MAGIC:
+        raise StateError("not a save state")
+    (_, version, frame, index, pattern_frame, timer, x, y, prev_x, prev_y, dash_timer, alive,
+     gauss, n, live, spawned, free_count, palette_count) = STATE_HEADER.unpack_from(data)
+    if version != STATE_VERSION:
+        raise StateError(f"unsupported save state version {version}")
+    offset = STATE_HEADER.size
+
+    def take(dtype, count):
+        nonlocal offset
+        arr = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        offset += arr.nbytes
+        return arr
+
+    try:
+        words = tuple(take("<u4", _RNG_WORDS).tolist())
+        palette = [tuple(c) for c in take(np.uint8, palette_count * 3).reshape(-1, 3).tolist()]
+        lasers = {"free": take("<i4", free_count).tolist()}
+        for name, dtype in _FIELD_DTYPES.items():
+            lasers[name] = take(dtype, n).copy()
+    except ValueError:
+        raise StateError("save state is truncated") from None
+    lasers.update(count=n, live=live, spawned=spawned, palette=palette)
+    return {
+        "frame": frame,
+        "rng": (3, words, None if gauss != gauss else gauss),
+        "player": {"x": x, "y": y, "prev_x": prev_x, "prev_y": prev_y,
+                   "dash_timer": dash_timer, "alive": alive},
+        "switcher": (index, pattern_frame, timer),
+        "lasers": lasers,
+    }
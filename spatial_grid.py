@@ -0,0 +1,114 @@
+import itertools
+
+import numpy as np
+
+from game_patterns import WIDTH, HEIGHT
+
+
+class SpatialGrid:
+    """Uniform grid broadphase for a LaserPool.
+
+    Each laser is filed under the cell containing the centre of its swept
+    segment (its span this frame plus the distance it just travelled). Only
+    lasers whose cell changed are moved between buckets on ``sync``, and a
+    query pads its box by the largest swept half-extent in the pool so it
+    never misses a laser that overhangs into a neighbouring cell.
+    """
+
+    def __init__(self, cell_size=64, width=WIDTH, height=HEIGHT, margin=64):
+        self.cell_size = cell_size
+        # Lasers are culled once they are a full length off screen, so the
+        # grid covers the playfield plus a margin on every side
+        self.origin = -margin
+        self.cols = int(np.ceil((width + 2 * margin) / cell_size))
+        self.rows = int(np.ceil((height + 2 * margin) / cell_size))
+        self.buckets = [set() for _ in range(self.cols * self.rows)]
+        self.cell = np.full(0, -1, dtype=np.int32)
+        self.max_extent = 0.0
+
+    def _cell_of(self, x, y):
+        # Truncation only differs from floor below the origin, which clips to 0 anyway
+        scale = 1.0 / self.cell_size
+        cx = ((x - self.origin) * scale).astype(np.int32)
+        cy = ((y - self.origin) * scale).astype(np.int32)
+        np.clip(cx, 0, self.cols - 1, out=cx)
+        np.clip(cy, 0, self.rows - 1, out=cy)
+        cy *= self.cols
+        cy += cx
+        return cy
+
+    def sync(self, pool):
+        """Bring the buckets in line with the pool after it moved or spawned lasers."""
+        n = pool.count
+        if self.cell.size < pool.capacity:
+            cell = np.full(pool.capacity, -1, dtype=np.int32)
+            cell[:self.cell.size] = self.cell
+            self.cell = cell
+        # Slots past the high-water mark may still be filed from before a trim
+        stale = np.flatnonzero(self.cell[n:] >= 0) + n
+        if stale.size:
+            self._move(stale, -1)
+
+        active = pool.active[:n]
+        length = pool.length[:n]
+        speed = pool.speed[:n]
+        half = 0.5 * (length + speed)
+        mid_x = pool.x[:n] + pool.cos[:n] * (0.5 * (length - speed))
+        mid_y = pool.y[:n] + pool.sin[:n] * (0.5 * (length - speed))
+        new_cell = np.where(active, self._cell_of(mid_x, mid_y), -1)
+        changed = np.flatnonzero(new_cell != self.cell[:n])
+        if changed.size:
+            self._move(changed, new_cell[changed])
+        if active.any():
+            self.max_extent = float((half + pool.width[:n] // 2)[active].max())
+        else:
+            self.max_extent = 0.0
+
+    def _move(self, slots, new_cells):
+        old_cells = self.cell[slots]
+        new_cells = np.broadcast_to(new_cells, slots.shape)
+        # Group by cell so bucket edits are one C-level set call per cell
+        for cell, group in _group_by(slots, old_cells):
+            self.buckets[cell].difference_update(group)
+        for cell, group in _group_by(slots, new_cells):
+            self.buckets[cell].update(group)
+        self.cell[slots] = new_cells
+
+    def query(self, min_x, min_y, max_x, max_y):
+        """Return slots filed in any cell the padded box touches."""
+        pad = self.max_extent
+        size = self.cell_size
+        x0 = max(0, int((min_x - pad - self.origin) // size))
+        y0 = max(0, int((min_y - pad - self.origin) // size))
+        x1 = min(self.cols - 1, int((max_x + pad - self.origin) // size))
+        y1 = min(self.rows - 1, int((max_y + pad - self.origin) // size))
+        if x0 > x1 or y0 > y1:
+            return np.empty(0, dtype=np.intp)
+        buckets = self.buckets
+        cols = self.cols
+        found = itertools.chain.from_iterable(
+            buckets[cy * cols + cx] for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1))
+        return np.fromiter(found, dtype=np.intp)
+
+    def clear(self):
+        for bucket in self.buckets:
+            bucket.clear()
+        self.cell[:] = -1
+        self.max_extent = 0.0
+
+
+def _group_by(slots, cells):
+    """Yield (cell, slot list) pairs for every non-negative cell id."""
+    keep = cells >= 0
+    slots = slots[keep]
+    cells = cells[keep]
+    if cells.size == 0:
+        return
+    order = np.argsort(cells, kind="stable")
+    cells = cells[order]
+    slots = slots[order].tolist()
+    starts = np.flatnonzero(np.diff(cells)) + 1
+    bounds = [0, *starts.tolist(), len(slots)]
+    ids = cells[bounds[:-1]].tolist()
+    for cell, lo, hi in zip(ids, bounds[:-1], bounds[1:]):
+        yield cell, slots[lo:hi]
@@ -0,0 +1,192 @@
+"""Determinism checks for save states, replays, VecEnv and swept collision.
+
+    python -m pytest -q test_determinism.py
+    python test_determinism.py          # same checks without pytest
+
+Everything here is headless and seeded. Each check compares a run
+against a second route to the same state: a restored snapshot, a packed
+and unpacked one, a replay seek, N independent Simulations, or a
+brute-force collision test.
+"""
+import os
+import random
+import sys
+import tempfile
+
+import numpy as np
+
+from collision import first_swept_hit, segment_segment_distance
+from emitters import composite_demo
+from env import VecEnv
+from game_patterns import LEVEL_PATTERNS
+from headless import RandomBot
+from laser_pool import LaserPool
+from pattern_scripts import default_level
+from replay import Replay, ReplayPlayer
+from simulation import Simulation, pack_state, unpack_state
+from spatial_grid import SpatialGrid
+
+LEVELS = {
+    "builtin": LEVEL_PATTERNS,
+    "script": default_level()[0],
+    "emitters": [(composite_demo(), 10)],
+}
+
+
+def _advance_lasers(sim, frames):
+    # Spawn and move without collision, so the pool keeps changing after a death
+    for _ in range(frames):
+        sim.spawn()
+        sim.lasers.update()
+
+
+def _trace(sim, bot, frames):
+    """Per-frame fingerprint of the player and the live lasers.
+
+    After a death the lasers keep going, so a short-lived bot still
+    exercises the pool, the patterns and the RNG for every frame.
+    """
+    out = []
+    for _ in range(frames):
+        alive = sim.step(bot(sim))
+        if not alive:
+            _advance_lasers(sim, 1)
+        slots = sim.lasers.active_slots()
+        out.append((sim.frame, sim.player.x, sim.player.y, sim.player.dash_timer, alive,
+                    sim.lasers.live, float(sim.lasers.x[slots].sum()),
+                    float(sim.lasers.angle[slots].sum())))
+    return out
+
+
+def test_snapshot_round_trips():
+    for name, patterns in LEVELS.items():
+        sim = Simulation(5, patterns=patterns)
+        _trace(sim, RandomBot(1), 400)
+        snap = sim.snapshot()
+        packed = pack_state(snap)
+        ref = _trace(sim, RandomBot(2), 600)
+        # The same in-memory snapshot restores cleanly more than once
+        for _ in range(2):
+            sim.restore(snap)
+            assert _trace(sim, RandomBot(2), 600) == ref, name
+        fresh = Simulation(5, patterns=patterns)
+        fresh.restore(unpack_state(packed))
+        assert _trace(fresh, RandomBot(2), 600) == ref, name
+        assert pack_state(unpack_state(packed)) == packed, name
+
+
+def test_snapshot_is_copy_on_write():
+    sim = Simulation(3, patterns=LEVELS["emitters"])
+    _advance_lasers(sim, 300)
+    snap = sim.snapshot()
+    frozen = {k: v[:snap["lasers"]["count"]].copy()
+              for k, v in snap["lasers"].items() if isinstance(v, np.ndarray)}
+    free = list(snap["lasers"]["free"])
+    _advance_lasers(sim, 300)
+    for key, values in frozen.items():
+        assert np.array_equal(snap["lasers"][key][:values.size], values), key
+    assert snap["lasers"]["free"] == free
+    # Writes after a restore must not reach the snapshot either
+    sim.restore(snap)
+    _advance_lasers(sim, 50)
+    for key, values in frozen.items():
+        assert np.array_equal(snap["lasers"][key][:values.size], values), key
+
+
+def test_replay_seek():
+    # Inputs chosen so the player survives long enough to seek around in
+    inputs = np.repeat(np.random.default_rng(4).integers(0, 16, 200).astype(np.uint8), 15)
+    replay = Replay(3, 60, "builtin", inputs)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run.bhr")
+        replay.save(path)
+        loaded = Replay.load(path)
+    assert np.array_equal(loaded.inputs, inputs) and loaded.seed == replay.seed
+
+    linear = ReplayPlayer(loaded, snapshot_interval=300)
+    ref = {}
+    while not linear.done():
+        linear.step()
+        ref[linear.frame] = (linear.sim.player.x, linear.sim.player.y, linear.sim.lasers.live)
+    assert linear.frame > 2000, "replay died early; pick other inputs"
+    seeker = ReplayPlayer(loaded, snapshot_interval=300)
+    for target in (1000, 250, 2000, 900, 1800):
+        seeker.seek(target)
+        frame = seeker.frame
+        assert (seeker.sim.player.x, seeker.sim.player.y, seeker.sim.lasers.live) == ref[frame]
+
+
+def test_vec_env_lockstep(num_envs=8, steps=1500):
+    for name, patterns in LEVELS.items():
+        envs = VecEnv(num_envs, seed=100, patterns=patterns)
+        envs.reset()
+        sims = [Simulation(100 + i, patterns=patterns) for i in range(num_envs)]
+        next_seed = 100 + num_envs
+        rng = random.Random(1)
+        for _ in range(steps):
+            actions = np.array([rng.getrandbits(5 if rng.random() < 0.2 else 4)
+                                for _ in range(num_envs)])
+            _, _, terminated, truncated, _ = envs.step(actions)
+            for i, sim in enumerate(sims):
+                alive = sim.step(int(actions[i]))
+                assert alive != bool(terminated[i]), (name, i, sim.frame)
+                if not alive or sim.frame >= envs.max_steps:
+                    assert terminated[i] or truncated[i]
+                    sims[i] = Simulation(next_seed, patterns=patterns)
+                    next_seed += 1
+                else:
+                    assert (sim.player.x, sim.player.y) == (envs.x[i], envs.y[i]), (name, i)
+                    assert sim.lasers.live == envs.lasers.owner_live[i], (name, i)
+
+
+def _brute_swept_hit(pool, x0, y0, x1, y1, radius):
+    slots = pool.active_slots()
+    lx, ly = pool.prev_x[slots], pool.prev_y[slots]
+    length = pool.length[slots]
+    dist = segment_segment_distance(x0, y0, (x1 - x0) - (pool.x[slots] - lx),
+                                    (y1 - y0) - (pool.y[slots] - ly), lx, ly,
+                                    pool.cos[slots] * length, pool.sin[slots] * length)
+    return bool((dist <= radius + pool.width[slots] // 2).any())
+
+
+def test_swept_collision(trials=300):
+    rng = np.random.default_rng(7)
+    plain, gridded = LaserPool(), LaserPool()
+    gridded.attach_index(SpatialGrid())
+    for _ in range(trials):
+        plain.clear()
+        gridded.clear()
+        n = int(rng.integers(1, 60))
+        args = (rng.uniform(0, 800, n), rng.uniform(0, 600, n), rng.uniform(0, 2 * np.pi, n),
+                rng.uniform(1, 12, n), (200, 0, 0), rng.integers(2, 8, n), rng.uniform(8, 64, n))
+        for pool in (plain, gridded):
+            pool.spawn_many(*args)
+            pool.update()
+        x0, y0 = rng.uniform(0, 800), rng.uniform(0, 600)
+        # Mostly walks, sometimes a dash-length jump
+        reach = 80 if rng.random() < 0.3 else 5
+        x1, y1 = x0 + rng.uniform(-reach, reach), y0 + rng.uniform(-reach, reach)
+        expected = _brute_swept_hit(plain, x0, y0, x1, y1, 4)
+        assert (first_swept_hit(plain, x0, y0, x1, y1, 4) >= 0) == expected
+        assert (first_swept_hit(gridded, x0, y0, x1, y1, 4) >= 0) == expected
+
+
+TESTS = [test_snapshot_round_trips, test_snapshot_is_copy_on_write, test_replay_seek,
+         test_vec_env_lockstep, test_swept_collision]
+
+
+def main():
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL {test.__name__}: {e}")
+        else:
+            print(f"ok   {test.__name__}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
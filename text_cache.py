@@ -0,0 +1,36 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, colour).
+
+    Menus and HUD labels change rarely, so rendering them once and blitting
+    the cached surface afterwards keeps ``Font.render`` off the frame path.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, background=None):
+        key = (font, text, color, background)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color, background)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.maxsize:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+text_cache = TextCache()
+render_text = text_cache.render
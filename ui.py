@@ -0,0 +1,78 @@
+"""Menu widgets. Fonts come from the asset cache on first draw, so building
+widgets needs no display."""
+import pygame
+
+from assets import assets
+from text_cache import render_text
+
+# Colors
+WHITE = (255, 255, 255)
+GRAY = (100, 100, 100)
+DARK_GRAY = (50, 50, 50)
+BLUE = (0, 120, 215)
+GREEN = (0, 200, 0)
+RED = (200, 0, 0)
+
+
+def fonts():
+    """The (large, small) UI fonts; pygame.font must be initialised first."""
+    # The default font needs no system font scan, so these load quickly
+    return assets.font(None, 48).result(), assets.font(None, 32).result()
+
+
+# Button class
+class Button:
+    def __init__(self, text, x, y, w, h):
+        self.text = text
+        self.rect = pygame.Rect(x, y, w, h)
+        self.color = GRAY
+        self.hover_color = BLUE
+        self.current_color = self.color
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, self.current_color, self.rect, border_radius=8)
+        text_surf = render_text(fonts()[0], self.text, WHITE)
+        text_rect = text_surf.get_rect(center=self.rect.center)
+        surface.blit(text_surf, text_rect)
+
+    def is_hovered(self, mouse_pos):
+        return self.rect.collidepoint(mouse_pos)
+
+    def update(self, mouse_pos):
+        """Refresh the hover colour; return True if it changed."""
+        color = self.hover_color if self.is_hovered(mouse_pos) else self.color
+        changed = color != self.current_color
+        self.current_color = color
+        return changed
+
+
+# Slider class for volume
+class Slider:
+    def __init__(self, x, y, w, h, min_val, max_val, start_val):
+        self.rect = pygame.Rect(x, y, w, h)
+        self.min_val = min_val
+        self.max_val = max_val
+        self.value = start_val
+        self.handle_rect = pygame.Rect(x + int((start_val - min_val) / (max_val - min_val) * w) - 10, y - 5, 20, h + 10)
+        self.dragging = False
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, WHITE, self.rect, 2)
+        pygame.draw.rect(surface, GREEN if self.dragging else GRAY, self.handle_rect)
+        value_text = render_text(fonts()[1], f"{int(self.value * 100)}%", WHITE)
+        surface.blit(value_text, (self.rect.right + 20, self.rect.centery - value_text.get_height() // 2))
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.handle_rect.collidepoint(event.pos):
+                self.dragging = True
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            x = max(self.rect.left, min(event.pos[0], self.rect.right))
+            self.handle_rect.x = x - self.handle_rect.width // 2
+            rel_x = x - self.rect.left
+            self.value = self.min_val + (rel_x / self.rect.width) * (self.max_val - self.min_val)
+
+    def get_value(self):
+        return self.value